@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+Scale benchmark: generate synthetic datasets of increasing size, run the pipeline
+stages on each and write a JSON and CSV report of wall time, peak RSS and
+throughput (items/s, items are pairs, edges or control draws depending on the stage).
+"""
+
+import argparse
+import os
+import time
+from netcentric.benchmark import entry_point_commands, run_entry_point, run_library_stages_isolated
+from netcentric.report import RunReport
+from netcentric.synthetic import make_dataset
+
+
+def parse_args(argv=None):
+    description = "Benchmark the pipeline on synthetic data"
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('-g', '--genes', type=int, nargs='*', default=[500, 1000, 2000], help="numbers of genes")
+    parser.add_argument('-n', '--samples', type=int, required=False, default=500, help="number of samples")
+    parser.add_argument('-m', '--methods', action='store', dest='alist',type=str, nargs='*', default=['discover','fishers','wext'])
+    parser.add_argument('-i', '--randiter', type=int, required=False, default=100)
+    parser.add_argument('-d', '--degree', type=float, required=False, default=10, help="mean degree of the network")
+    parser.add_argument('-s', '--seed', type=int, required=False, default=0)
+    parser.add_argument('-w', '--workdir', type=str, required=False, default='../benchmark_runs', help="synthetic datasets are written here")
+    parser.add_argument('-o', '--out', type=str, required=False, default='../benchmark_results/scale', help="report prefix, .json and .csv are added")
+    parser.add_argument('--entry_points', action='store_true', help="also run the scripts end-to-end on each dataset")
+    parser.add_argument('--timeout', type=float, required=False, default=None, help="seconds after which an entry point is killed")
+    parser.add_argument('--no_figures', action='store_true', help="skip the plotting stage")
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    '''Run the benchmark of the command line argv and write its report. Returns the RunReport.'''
+    args = parse_args(argv)
+
+    methods = args.alist
+    report = RunReport(genes=args.genes, samples=args.samples, methods=methods, randiter=args.randiter,
+                       degree=args.degree, seed=args.seed, started=time.strftime('%Y-%m-%d %H:%M:%S'))
+
+    for n_genes in args.genes:
+        print('genes:', n_genes)
+        data_dir = os.path.join(args.workdir, 'genes_{}'.format(n_genes), 'data')
+        with report.stage('generate', n_genes=n_genes) as record:
+            info = make_dataset(data_dir, n_genes, n_samples=args.samples, methods=methods, mean_degree=args.degree, seed=args.seed)
+            record['items'] = info['n_pairs']*len(methods)
+
+        records = run_library_stages_isolated(info, methods, randiter=args.randiter, seed=args.seed, use_figures=not args.no_figures)
+        for record in records:
+            record['n_genes'] = n_genes
+        report.extend(records)
+
+        if args.entry_points:
+            for name, command in entry_point_commands(info, methods, randiter=args.randiter).items():
+                record = run_entry_point(name, command, info, report, timeout=args.timeout)
+                record['n_genes'] = n_genes
+                print(name, 'returncode', record['returncode'], '{:.1f}s'.format(record['wall_s']))
+
+    report.write_json(args.out + '.json')
+    report.write_csv(args.out + '.csv')
+    print('report:', args.out + '.json', args.out + '.csv')
+    return report
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""
+Convert the pairwise ME result files into their binary columnar cache.
+The evaluation scripts read the cache transparently; converting ahead of time
+lets several jobs share it from the start.
+"""
+
+import argparse
+from tqdm import tqdm
+from netcentric.me_cache import convert_result_file
+from netcentric.me_results import result_file_paths
+
+if __name__ == '__main__':
+
+    # parse arguments
+    description = "Convert ME result files to binary cache"
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('-c', "--cancer_type", type=str, required=True, help="cancer type")
+    parser.add_argument('-t', '--t', type=int, required=False, default=20, help="mutation threshold")
+    parser.add_argument('-m', '--methods', action='store', dest='alist',type=str, nargs='*', default=['discover','fishers','wext'])
+    parser.add_argument('--intact', action='store_true', help="also convert the intact filtered pair files")
+
+    args = parser.parse_args()
+
+    c = args.cancer_type
+    t = args.t
+    methods=args.alist
+
+    dict_infile, dict_infile_intact = result_file_paths(methods, c, t)
+
+    for m in tqdm(methods):
+        table = convert_result_file(dict_infile[m], m)
+        print(m, dict_infile[m], '{} genes, {} pairs'.format(len(table.genes), len(table)))
+        if args.intact:
+            table = convert_result_file(dict_infile_intact[m], m)
+            print(m, dict_infile_intact[m], '{} genes, {} pairs'.format(len(table.genes), len(table)))
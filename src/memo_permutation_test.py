@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+MEMO permutation test of a cancer type, computed by netcentric.memo.
+Writes the all-genes and the INTACT filtered result files of MEMO in the layout read
+by the evaluations (index, gene1, gene2, pvalue).
+"""
+
+import os
+import time
+import argparse
+import numpy as np
+from netcentric.datasets import DataLoader
+from netcentric.memo import SWAPS_PER_EDGE, intact_table, memo_pvalues, memo_table
+from netcentric.report import RunReport, peak_rss_mb
+from netcentric.streams import MASTER_SEED, RandomStreams
+
+
+def parse_args(argv=None):
+    description = "MEMO permutation test"
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('-c', "--cancer_type", type=str, required=True, help="cancer type")
+    parser.add_argument('-t', '--t', type=int, required=False, default=20, help="mutation threshold")
+    parser.add_argument('-i', '--iterations', type=int, required=False, default=10000, help="random graphs")
+    parser.add_argument('-q', '--swaps_per_edge', type=int, required=False, default=SWAPS_PER_EDGE, help="swap attempts per mutation of every random graph")
+    parser.add_argument('-rp', '--ref_pairs', action='store_true', help="test only the pairs with a CGC gene")
+    parser.add_argument('-ch', '--chains', type=int, required=False, default=None, help="random graphs swapped at once per process, by the matrix size by default")
+    parser.add_argument('-w', '--workers', type=int, required=False, default=1, help="number of processes, chunks of random graphs are drawn in parallel")
+    parser.add_argument('-s', '--seed', type=int, required=False, default=MASTER_SEED, help="master seed of the random streams")
+    parser.add_argument('-o', '--outpath', type=str, required=False, default='../out/memo_mutation_filtered_ep_data/', help="output directory")
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None, loader=None):
+    '''Write the MEMO result files of the command line argv. loader: DataLoader to take the inputs from.'''
+    args = parse_args(argv)
+    loader = loader or DataLoader()
+
+    c = args.cancer_type
+    t = args.t
+    outpath = os.path.join(args.outpath, '')
+    report = RunReport(script=os.path.basename(__file__), args=vars(args), started=time.strftime('%Y-%m-%d %H:%M:%S'))
+    run_start = time.perf_counter()
+
+    with report.stage('load') as record:
+        matrix = loader.mutation_matrix(c)
+        genes = matrix.genes_above(t)
+        G_matrix = matrix.dense(genes)
+        cosmic_genes = set(loader.reference_genes())
+        rows = np.array([i for i, g in enumerate(genes) if g in cosmic_genes], dtype=np.int64) if args.ref_pairs else None
+        edges = loader.network().edges()
+        record['items'] = len(genes)
+    print(c, t, '{} patients, {} genes, {} mutations'.format(G_matrix.shape[0], len(genes), int(G_matrix.sum())))
+
+    with report.stage('permutations', items=args.iterations):
+        pvalues = memo_pvalues(G_matrix, iterations=args.iterations, rows=rows, swaps_per_edge=args.swaps_per_edge,
+                               chains=args.chains, workers=args.workers, streams=RandomStreams(args.seed))
+
+    with report.stage('output'):
+        if not os.path.exists(outpath):
+            os.makedirs(outpath)
+        cols = ['gene1', 'gene2', 'pvalue']
+        memo_table(genes, pvalues, rows).to_csv(outpath + '{}_memo_result_mutations_all_genes_{}.txt'.format(c, t), sep='\t', columns=cols)
+        intact_table(genes, pvalues, edges, rows).to_csv(outpath + '{}_memo_pairs_intact_filtered_subset{}.txt'.format(c, t), sep='\t', columns=cols)
+
+    report.add('total', time.perf_counter() - run_start, peak_rss=peak_rss_mb())
+    report.write_json(outpath + 'run_reports/{}_memo_{}.json'.format(c, t))
+    return genes, pvalues
+
+
+if __name__ == '__main__':
+    main()
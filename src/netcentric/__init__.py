@@ -0,0 +1,5 @@
+# -*- coding: utf-8 -*-
+"""
+Shared loaders and evaluation kernels for the network-centric evaluation
+of mutual exclusivity tests.
+"""
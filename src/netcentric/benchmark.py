@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""
+Scale benchmark of the pipeline stages on synthetic datasets (netcentric.synthetic).
+
+Library stages, timed in a fresh process per dataset so peak RSS is per scale:
+    parse          all-pairs ME result file to PairTable, no cache
+    cache_load     PairTable from the binary cache
+    rows           -log p rows of the reference genes (min-p rule applied)
+    network_parse  edge and index files to CSR
+    neighbors      neighbor sets of the cohort genes
+    randomization  both evaluations of every reference gene (evaluation.get_pvalues_single)
+    aggregation    summary rows of a method (evaluation.summarize_method)
+    summary        tables of all methods in the article format (evaluation.summary_tables)
+    plotting       per gene figure saved as PDF
+Entry points (optional): the scripts of src/ run end-to-end against the dataset.
+"""
+
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+
+import pandas as pd
+
+from netcentric.datasets import read_reference_genes
+from netcentric.evaluation import get_pvalues_single, summarize_method, summary_tables
+from netcentric.me_cache import load_pair_table
+from netcentric.network import load_network
+from netcentric.report import RunReport
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+POLL_S = 0.05
+
+
+def run_library_stages(info, methods, randiter=100, seed=0, use_figures=True):
+    '''
+    Run the library stages on a dataset written by make_dataset, returns the stage records.
+    '''
+    report = RunReport()
+    reference_genes = read_reference_genes(info['ref_file'])
+    rows_cgnnb, rows_cgncgnb = [], []
+    per_gene = []
+
+    with report.stage('network_parse', items=info['n_edges']):
+        network = load_network(info['edge_file'], index_file=info['index_file'], use_cache=False)
+
+    for m in methods:
+        filename = info['result_files'][m]
+        with report.stage('parse', method=m) as record:
+            table = load_pair_table(filename, m, use_cache=False)
+            record['items'] = len(table)
+
+        load_pair_table(filename, m)
+        with report.stage('cache_load', method=m) as record:
+            table = load_pair_table(filename, m)
+            record['items'] = len(table)
+
+        with report.stage('rows', method=m, items=len(table)):
+            rows = table.rows(reference_genes)
+
+        with report.stage('neighbors', method=m, items=info['n_edges']):
+            dict_neighbors = network.neighbor_sets(table.genes)
+
+        # the stages of get_pvalues_single itself (kernel) are not kept, rows and neighbors are timed above
+        with report.stage('randomization', method=m, randiter=randiter) as record:
+            result = get_pvalues_single(table, m, reference_genes, network, randiter=randiter, seed=seed,
+                                        rows=rows, dict_neighbors=dict_neighbors)
+            # one control draw per CGC-CGC pair, iteration and evaluation
+            record['items'] = int(2*randiter*sum(result[5].values()))
+
+        with report.stage('aggregation', method=m, items=len(result[5])):
+            row_cgnnb, row_cgncgnb = summarize_method(m, result)
+            rows_cgnnb.append(row_cgnnb)
+            rows_cgncgnb.append(row_cgncgnb)
+            per_gene.extend((m, g, case1) for g, case1 in result[7].items())
+
+    with report.stage('summary', items=len(methods)):
+        summary_tables(rows_cgnnb, rows_cgncgnb)
+
+    if use_figures:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+        outfile = os.path.join(info['data_dir'], 'benchmark_figure.pdf')
+        with report.stage('plotting', items=len(per_gene)):
+            df = pd.DataFrame(per_gene, columns=['method', 'gene', 'case1'])
+            fig, ax = plt.subplots(figsize=(8, 6))
+            for m, group in df.groupby('method'):
+                ax.hist(group['case1'].dropna(), bins=30, alpha=0.5, label=m)
+            ax.legend()
+            fig.savefig(outfile)
+            plt.close(fig)
+
+    return report.stages
+
+
+def _run_in_child(args):
+    return run_library_stages(*args)
+
+
+def run_library_stages_isolated(info, methods, randiter=100, seed=0, use_figures=True):
+    '''run_library_stages in a fresh process, so its peak RSS belongs to this dataset'''
+    ctx = multiprocessing.get_context('fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn')
+    with ctx.Pool(1) as pool:
+        return pool.apply(_run_in_child, ((info, methods, randiter, seed, use_figures),))
+
+
+def entry_point_commands(info, methods, randiter=100):
+    '''command lines of the scripts against a synthetic dataset'''
+    c, t = info['c'], str(info['t'])
+    return {'evaluations_on_metrics': ['evaluations_on_metrics.py', '-c', c, '-t', t, '-i', str(randiter), '-m'] + list(methods)
+                                      + ['-p', '0.05', '-ni', 'intact_nodupl_index_file.txt', '-e', 'intact_nodupl_edge_file.txt',
+                                         '-r', 'Census_allFri_Apr_26_12_49_57_2019.tsv'],
+            'evaluations_via_tsn': ['evaluations_via_tsn.py', '-c', c, '-t', t, '-m'] + list(methods)
+                                   + ['-ti', info['tissue'], '-th', '0.0'],
+            'evaluations_via_mla': ['evaluations_via_mla.py', '-c', c, '-t', t, '-m'] + list(methods),
+            'me_on_tsn_ntsn_roc_curve': ['me_on_tsn_ntsn_roc_curve.py', '-c', c, '-t', t, '-m'] + list(methods)
+                                        + ['-th', '0.0', '-p', '0.25']}
+
+
+def _wait(p, timeout=None):
+    '''
+    Wait for a child process, killed when it runs longer than timeout seconds.
+    Returns its return code, its peak RSS in MB (None without os.wait4) and whether it timed out.
+    '''
+    deadline = None if timeout is None else time.perf_counter() + timeout
+    if not hasattr(os, 'wait4'):
+        try:
+            return p.wait(timeout=timeout), None, False
+        except subprocess.TimeoutExpired:
+            p.kill()
+            return p.wait(), None, True
+
+    timed_out = False
+    while True:
+        pid, status, usage = os.wait4(p.pid, 0 if deadline is None or timed_out else os.WNOHANG)
+        if pid:
+            break
+        if time.perf_counter() >= deadline:
+            p.kill()
+            timed_out = True
+        else:
+            time.sleep(POLL_S)
+    p.returncode = os.WEXITSTATUS(status) if os.WIFEXITED(status) else -1
+    scale = 1024.0*1024.0 if sys.platform == 'darwin' else 1024.0
+    return p.returncode, usage.ru_maxrss/scale, timed_out
+
+
+def run_entry_point(name, command, info, report, timeout=None):
+    '''
+    Run a script of src/ with the synthetic data directory as ../data, recording wall
+    time and the peak RSS of the child process. The script is killed after timeout seconds.
+    '''
+    workdir = os.path.join(os.path.dirname(os.path.dirname(info['data_dir'])), 'run')
+    if not os.path.exists(workdir):
+        os.makedirs(workdir)
+    env = dict(os.environ, PYTHONPATH=SRC_DIR + os.pathsep + os.environ.get('PYTHONPATH', ''), MPLBACKEND='Agg')
+    start = time.perf_counter()
+    with open(os.path.join(workdir, name + '.log'), 'w') as log:
+        p = subprocess.Popen([sys.executable, os.path.join(SRC_DIR, command[0])] + command[1:],
+                             cwd=workdir, stdout=log, stderr=subprocess.STDOUT, env=env)
+        returncode, peak, timed_out = _wait(p, timeout)
+    wall = time.perf_counter() - start
+    return report.add('entry_point', wall, peak_rss=peak, script=name, returncode=returncode, timed_out=timed_out)
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+Checkpoints of the per gene kernel results of get_pvalues_single.
+
+The results of the reference genes are saved in shards, one .npz file per completed
+work unit, so a save writes only the genes of its unit: the gene symbols, the two
+17-tuples of every gene as a float array, the iterations drawn per gene, the bootstrap
+replicates of the medians when drawn, and the settings of the run. The shards of a
+checkpoint are merged when it is loaded. Every gene draws from its own random streams,
+so genes restored from a checkpoint give the same tables as an uninterrupted run.
+"""
+
+import json
+import os
+import re
+import zlib
+
+import numpy as np
+
+CHECKPOINT_EVERY = 25
+
+
+def checkpoint_params(m, reference, network_name, genes, **settings):
+    '''settings identifying a kernel run; a checkpoint is resumed only by a run of the same settings'''
+    params = dict(settings, method=m, reference=reference, network=network_name,
+                  genes=len(genes), genes_crc=zlib.crc32('\n'.join(genes).encode('utf-8')))
+    return json.dumps(params, sort_keys=True, default=str)
+
+
+def checkpoint_file(checkpoint_dir, m, reference=None, network_name=None):
+    '''path of a checkpoint, its shards are path.<shard>.npz'''
+    name = '_'.join(str(part) for part in (m, reference, network_name) if part is not None)
+    return os.path.join(checkpoint_dir, name.replace(os.sep, '-'))
+
+
+def shard_files(path):
+    '''shard files of a checkpoint, in order of shard number'''
+    dirname, name = os.path.split(path)
+    pattern = re.compile(re.escape(name) + r'\.(\d+)\.npz$')
+    if not os.path.isdir(dirname or '.'):
+        return []
+    shards = [(int(match.group(1)), f) for f in os.listdir(dirname or '.') for match in [pattern.match(f)] if match]
+    return [os.path.join(dirname, f) for _, f in sorted(shards)]
+
+
+def next_shard(path):
+    '''number of the next shard of a checkpoint'''
+    files = shard_files(path)
+    return int(files[-1].rsplit('.', 2)[-2]) + 1 if files else 0
+
+
+def clear_checkpoint(path):
+    '''remove the shards of a checkpoint'''
+    for f in shard_files(path):
+        os.remove(f)
+
+
+def save_checkpoint(path, params, results, iterations, replicates=None, shard=0):
+    '''
+    Write the results {g: (first evaluation, second evaluation)} and iterations {g: iterations drawn}
+    of the genes completed since the last save as shard number shard, and their bootstrap
+    replicates {g: (first, second)} of kernels.bootstrap_medians arrays, None for an evaluation
+    without replicates. The shard is written atomically, a run killed while saving keeps the
+    previous shards.
+    '''
+    dirname = os.path.dirname(path)
+    if dirname and not os.path.exists(dirname):
+        os.makedirs(dirname)
+    genes = list(results)
+    values = np.array([results[g] for g in genes], dtype=float).reshape(len(genes), 2, -1)
+    arrays = dict(genes=np.array(genes, dtype=str), values=values, iterations=np.array([iterations[g] for g in genes], dtype=np.int64),
+                  params=np.array(params))
+    replicates = replicates or {}
+    shapes = [r.shape for g in genes for r in replicates.get(g, ()) if r is not None]
+    if shapes:
+        boot = np.full((len(genes), 2) + shapes[0], np.nan)
+        for i, g in enumerate(genes):
+            for e, r in enumerate(replicates.get(g, (None, None))):
+                if r is not None:
+                    boot[i, e] = r
+        arrays['replicates'] = boot
+    outfile = '{}.{}.npz'.format(path, shard)
+    with open(outfile + '.tmp', 'wb') as f:
+        np.savez(f, **arrays)
+    os.replace(outfile + '.tmp', outfile)
+
+
+def _as_result(row):
+    '''17-tuple of a saved row, the number of pairs as int as computed'''
+    k = row[0]
+    return (k if np.isnan(k) else int(k),) + tuple(row[1:])
+
+
+def load_checkpoint(path, params):
+    '''
+    Results {g: (first evaluation, second evaluation)}, iterations {g: iterations drawn} and bootstrap
+    replicates {g: (first, second)} of the shards of a checkpoint, empty when there is no checkpoint
+    or it was written by a run of other settings.
+    '''
+    results, iterations, replicates = {}, {}, {}
+    for shard in shard_files(path):
+        with np.load(shard, allow_pickle=False) as data:
+            if str(data['params']) != params:
+                print('checkpoint {} is of other settings, not resumed'.format(path))
+                return {}, {}, {}
+            genes, values, n = data['genes'].tolist(), data['values'], data['iterations'].tolist()
+            boot = data['replicates'] if 'replicates' in data else None
+        if boot is not None:
+            replicates.update((g, tuple(None if np.isnan(boot[i, e]).all() else boot[i, e] for e in range(2))) for i, g in enumerate(genes))
+        results.update((g, (_as_result(values[i, 0]), _as_result(values[i, 1]))) for i, g in enumerate(genes))
+        iterations.update(zip(genes, n))
+    return results, iterations, replicates
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+Lazily loaded inputs of the data directory.
+
+A DataLoader reads every dataset (networks, reference genes, result tables, MLA
+values, mutation matrices) on first use and keeps it, so a notebook or a batch
+driver can evaluate many configurations in one process without reading the same
+files again. The returned objects are shared between callers and must be treated
+as read-only.
+"""
+
+import os
+
+from netcentric.me_cache import load_pair_table
+from netcentric.me_results import result_file_paths
+from netcentric.mutations import load_mutation_matrix
+from netcentric.network import load_network
+from netcentric.reference import ReferenceSets
+
+DATA_DIR = '../data/'
+
+# (network index file, network edge file): results directory under ME_results
+NETWORK_FILES = {('intact_nodupl_index_file.txt', 'intact_nodupl_edge_file.txt'): 'intact_results',
+                 ('hint_index_file.txt', 'hint_edge_file.txt'): 'hint_results',
+                 ('intact_index_file_0.25.txt', 'intact_edge_file_0.25.txt'): 'intact_results_0.25',
+                 ('intact_index_file_0.45.txt', 'intact_edge_file_0.45.txt'): 'intact_results_0.45'}
+
+# reference gene file: suffix of the results directory
+REFERENCE_FILES = {'Census_allFri_Apr_26_12_49_57_2019.tsv': '_CGC',
+                   'Census_allFri_Apr_26_12_49_57_2019_SNV_filtered.txt': '_CGC_SNV',
+                   'INTOGEN_filtered.txt': '_Intogen'}
+
+CGC_FILE = 'Census_allFri_Apr_26_12_49_57_2019.tsv'
+
+TISSUES = {'BLCA': 'Bladder',
+           'BRCA': 'Breast',
+           'COADREAD': 'Colon',
+           'LUAD': 'Lung',
+           'LUSC': 'Lung',
+           'SKCM': 'Skin',
+           'STAD': 'Stomach',
+           'UCEC': 'Uterus'}
+
+METHOD_NAMES = {'discover': 'DISCOVER',
+                'discover_strat': 'DISCOVER Strat',
+                'fishers': 'Fisher\'s Exact Test',
+                'megsa': 'MEGSA',
+                'memo': 'MEMO',
+                'wext': 'WExT'}
+
+
+def read_reference_genes(ref_file):
+    '''reference genes of a file with a header line, gene symbols in the first column'''
+    with open(ref_file, 'r') as f:
+        return [line.split()[0].upper() for line in f.readlines()[1:]]
+
+
+def read_mla(mla_file):
+    '''{gene: MLA} of a standardized MLA file'''
+    with open(mla_file, 'r') as f:
+        return {line.split()[0]: float(line.split()[1]) for line in f.readlines()}
+
+
+def read_tsn_confidences(tsn_file):
+    '''{(gene1, gene2): tissue specific fraction} in the order of the file'''
+    with open(tsn_file) as f:
+        return {(line.split()[0], line.split()[1]): float(line.split()[2]) for line in f}
+
+
+class DataLoader(object):
+    '''
+    Memoized loaders of the inputs under data_dir.
+    data_dir: the data directory, ../data/ as seen from src/ by default,
+    use_cache: read and write the binary caches of networks and result tables.
+    '''
+
+    def __init__(self, data_dir=DATA_DIR, use_cache=True):
+        self.data_dir = os.path.join(data_dir, '')
+        self.use_cache = use_cache
+        self._loaded = {}
+
+    def _memo(self, key, load):
+        if key not in self._loaded:
+            self._loaded[key] = load()
+        return self._loaded[key]
+
+    def clear(self):
+        '''forget the loaded datasets'''
+        self._loaded.clear()
+
+    def path(self, *parts):
+        return os.path.join(self.data_dir, *parts)
+
+    def result_files(self, methods, c, t):
+        '''all-genes and intact filtered result files of the methods'''
+        return result_file_paths(methods, c, t, data_dir=self.data_dir)
+
+    def network(self, edge_file='intact_nodupl_edge_file.txt', index_file='intact_nodupl_index_file.txt'):
+        '''PPI network of an edge and index file of the data directory'''
+        return self._memo(('network', edge_file, index_file),
+                          lambda: load_network(self.path(edge_file), index_file=self.path(index_file) if index_file else None,
+                                               use_cache=self.use_cache))
+
+    def tsn_file(self, tissue, threshold):
+        return self.path('gtex_tsn_fractions_intact_filtered_applied_threshold',
+                         'edges_gtex_intact_filtered_{}_{}.txt'.format(tissue, threshold))
+
+    def tsn_network(self, tissue, threshold):
+        '''tissue specific network of a tissue and TSN threshold'''
+        return self._memo(('tsn_network', tissue, threshold),
+                          lambda: load_network(self.tsn_file(tissue, threshold), use_cache=self.use_cache))
+
+    def tsn_confidences(self, tissue, threshold):
+        return self._memo(('tsn_confidences', tissue, threshold),
+                          lambda: read_tsn_confidences(self.tsn_file(tissue, threshold)))
+
+    def reference_genes(self, ref=CGC_FILE):
+        '''reference genes of a file in known_cancer_genes/'''
+        return self._memo(('reference_genes', ref), lambda: read_reference_genes(self.path('known_cancer_genes', ref)))
+
+    def reference_sets(self, refs=(CGC_FILE,)):
+        '''ReferenceSets registry of reference gene files, each set named after its file'''
+        def load():
+            registry = ReferenceSets()
+            for ref in refs:
+                registry.add(ref, self.reference_genes(ref))
+            return registry
+        return self._memo(('reference_sets', tuple(refs)), load)
+
+    def mla(self, c):
+        return self._memo(('mla', c), lambda: read_mla(self.path('MLA_ep_mutation_filtered_all_genes', '{}_MLA_standardized.txt'.format(c))))
+
+    def mutation_matrix(self, c):
+        '''bit-packed MutationMatrix of a cancer type, without the label column'''
+        return self._memo(('mutation_matrix', c),
+                          lambda: load_mutation_matrix(self.path('binary_matrices_all_genes_ep_mutation_filtered', c + '_TML_binary_sm.txt'),
+                                                       use_cache=self.use_cache))
+
+    def mutated_genes(self, c, t):
+        '''genes mutated in more than t samples'''
+        return self._memo(('mutated_genes', c, t), lambda: self.mutation_matrix(c).genes_above(t))
+
+    def pair_table(self, m, c, t, intact=False, pvalue_position=3):
+        '''ME results of a method as a PairTable, all genes or intact filtered pairs'''
+        def load():
+            dict_infile, dict_infile_intact = self.result_files([m], c, t)
+            filename = dict_infile_intact[m] if intact else dict_infile[m]
+            return load_pair_table(filename, m, pvalue_position=pvalue_position, use_cache=self.use_cache)
+        return self._memo(('pair_table', m, c, t, intact, pvalue_position), load)
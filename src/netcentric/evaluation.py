@@ -0,0 +1,596 @@
+# -*- coding: utf-8 -*-
+"""
+Evaluation of ME methods on a network: the two randomized evaluations of the
+CGC-CGC neighbor pairs, their per method summary and the article table format.
+
+The functions take their inputs (result tables or files, reference genes, network)
+as arguments, so one process can evaluate many configurations with inputs loaded
+once, e.g. through netcentric.datasets.DataLoader. Used by evaluations_on_metrics.py
+(PPI networks) and evaluations_via_tsn.py (tissue specific networks).
+"""
+
+import numpy as np
+import pandas as pd
+from tqdm.auto import tqdm
+
+from netcentric.checkpoint import CHECKPOINT_EVERY, checkpoint_file, checkpoint_params, clear_checkpoint, load_checkpoint, next_shard, save_checkpoint
+from netcentric.datasets import METHOD_NAMES
+from netcentric.kernels import evaluate_reference_genes
+from netcentric.me_cache import load_pair_table
+from netcentric.network import threshold_neighbor_sets
+from netcentric.parallel import run_tasks, split_units
+from netcentric.reference import ReferenceSets
+from netcentric.report import RunReport
+from netcentric.streams import MASTER_SEED, RandomStreams
+
+COLS_SUM = ['method', 'pairs','case1', 'case2', 'case3', 'case4', 'case5', 'case6', '(1+2)','(3+6)', 'sgm_allCGNB','sgm_sigCGNB','avg_allCGNB','avg_CGNNB','sgm_allCGNNB','sgm_sigCGNNB',\
+            'TP', 'FP', 'TN', 'FN', 'PR','SN(TPR)', 'SP(TNR)', 'F1']
+COLS_SUM_NCGNB = ['method', 'pairs','case1', 'case2', 'case3', 'case4', 'case5', 'case6', '(1+2)','(3+6)', 'sgm_allCGNB','sgm_sigCGNB','avg_allCGNB','avg_sigCGNCGB','sgm_allNCGNB','sgm_sigNCGNB',\
+                  'TP', 'FP', 'TN', 'FN', 'PR','SN(TPR)', 'SP(TNR)', 'F1']
+COLS_SE = ['SE Stat1','SE Stat2','SE Stat3','SE Stat4','SE Stat5','SE Stat6', 'SE Stat8',
+           'SE Precision', 'SE Sensitivity', 'SE Specificity', 'SE F1 Score']
+
+
+def get_cg_cg_genes(cohort_specific_genes, dict_neighbor, ref_genes):
+    """get (cosmic gene --- cosmic gene) pairs"""
+    set_cg_cg = set()
+    for g in set.intersection(set(cohort_specific_genes),set(dict_neighbor), set(ref_genes)):
+        if len(set.intersection(set(dict_neighbor[g]), set(ref_genes)))>0:
+               set_cg_cg.update([g])
+                
+    return set_cg_cg
+
+
+###################################################################################################
+
+# main function to run both evaluations
+    
+###################################################################################################      
+
+def get_pvalues_single(table, m, reference_genes, network, pvalue_threshold=0.05, randiter=100, pvalue_position=3, common_random_numbers=False, gene_workers=1, seed=MASTER_SEED, exact=False, adaptive=None, bootstrap=0, report=None, rows=None, dict_neighbors=None, reference=None, network_name=None,
+                       checkpoint_dir=None, resume=False, checkpoint_every=CHECKPOINT_EVERY, kernel_cache=None):
+    """main function to evaluate methods based on their pvalues.
+    table: ME results of the method, a netcentric.me_cache.PairTable or the result file to read
+    m: method, zero p-values are handled per method
+    reference_genes: known driver genes (e.g. CGC)
+    network: PPI or tissue specific network (netcentric.network.Network)
+    pvalue_threhsold: significance threhsold
+    randiter: amount of iterations to account for randomization
+    pvalue_position: column number from mutex result file where p-values are stored. Default is 3.
+    common_random_numbers: draw the controls of both evaluations from one shared random stream
+    gene_workers: number of processes for the reference genes,
+    seed: master seed; every (method, reference gene) draws from its own stream, so the
+    results do not depend on the number of processes or on the order of methods and genes
+    exact: exact medians of the case counts and expected RHS sums instead of randiter draws (kernels.exact_case_counts)
+    adaptive: kernels.AdaptiveIterations, draw iterations per reference gene until its medians converge instead of randiter;
+    the iterations of every gene are recorded with the kernel timings
+    bootstrap: number of bootstrap replicates of the randomized medians of every reference gene; when > 0 the
+    replicates {g: (replicates, 8) array} of both evaluations are appended to the returned tuple (see summarize_method)
+    report: netcentric.report.RunReport receiving the stage timings of the method
+    rows, dict_neighbors: -log p rows of (a superset of) the reference genes and neighbor sets of the
+    cohort genes when already computed, e.g. shared by several reference sets
+    reference, network_name: names of the reference set and of the network, recorded with the kernel timings
+    checkpoint_dir: save the results of the completed reference genes there every checkpoint_every genes,
+    resume: start from the checkpoint of an earlier run of the same settings, skipping its genes
+    kernel_cache: {g: (results, iterations, bootstrap replicates)} of reference genes evaluated before with the same
+    settings and neighbor sets; they are taken instead of evaluated again, and the evaluated genes are added
+    """
+    if report is None:
+        report = RunReport()
+    #read file once: genes and min nonzero pvalue, then the -log p rows of reference genes
+    if isinstance(table, str):
+        with report.stage('parse', method=m) as record:
+            table = load_pair_table(table, m, pvalue_position=pvalue_position)
+            record['items'] = len(table)
+    genes, min_pval = list(table.genes), table.min_pval
+    reference_set = set(reference_genes)
+    if rows is None:
+        with report.stage('rows', method=m) as record:
+            rows = table.rows(reference_genes)
+            record['items'] = len(rows)
+    dict_temp = {g: row for g, row in rows.items() if g in reference_set}
+    print('Total Genes:',len(genes))
+    print('min pval:',min_pval)
+    
+    ## dictionaries for pos/neg
+    #1
+
+    dict_pairs_cgcg_for_nnb = {}
+    dict_nnb_sigLHS_nonsigRHS = {} #1
+    dict_nnb_sigLHS_sigRHS_LHS = {} #2
+    dict_nnb_sigLHS_sigRHS_RHS = {} #3
+    dict_nnb_nonsigLHS_sigRHS = {} #6
+    dict_nnb_nonsigLHS_nonsigRHS_LHS = {} #4
+    dict_nnb_nonsigLHS_nonsigRHS_RHS = {} #5
+    dict_nnb_sum_LHS = {}
+    dict_nnb_sum_sig_LHS = {}
+    dict_nnb_sum_RHS = {}
+    dict_nnb_sum_sig_RHS = {}
+    
+    dict_norm_nnb_sigLHS_nonsigRHS = {} #1
+    dict_norm_nnb_sigLHS_sigRHS_LHS = {} #2
+    dict_norm_nnb_sigLHS_sigRHS_RHS = {} #3
+    dict_norm_nnb_nonsigLHS_sigRHS = {} #6
+    dict_norm_nnb_nonsigLHS_nonsigRHS_LHS = {} #4
+    dict_norm_nnb_nonsigLHS_nonsigRHS_RHS = {} #5
+    
+    
+    
+    #2
+
+    
+    dict_pairs_cgcg_for_ncgnb = {}
+    dict_ncgnb_sigLHS_nonsigRHS = {} #1
+    dict_ncgnb_sigLHS_sigRHS_LHS = {} #2
+    dict_ncgnb_sigLHS_sigRHS_RHS = {} #3
+    dict_ncgnb_nonsigLHS_sigRHS = {} #6
+    dict_ncgnb_nonsigLHS_nonsigRHS_LHS = {} #4
+    dict_ncgnb_nonsigLHS_nonsigRHS_RHS = {} #5
+    dict_ncgnb_sum_sig_LHS = {}
+    dict_ncgnb_sum_LHS = {}
+    dict_ncgnb_sum_sig_RHS = {} 
+    dict_ncgnb_sum_RHS = {}    
+    
+    dict_norm_ncgnb_sigLHS_nonsigRHS = {} #1
+    dict_norm_ncgnb_sigLHS_sigRHS_LHS = {} #2
+    dict_norm_ncgnb_sigLHS_sigRHS_RHS = {} #3
+    dict_norm_ncgnb_nonsigLHS_sigRHS = {} #6
+    dict_norm_ncgnb_nonsigLHS_nonsigRHS_LHS = {} #4
+    dict_norm_ncgnb_nonsigLHS_nonsigRHS_RHS = {} #5
+    
+    
+    ## dictionaries for cg-ncg neighbor degrees
+    dict_neighbors_degree_all = {}
+    dict_neighbors_cg = {}
+    dict_neighbors_ncg = {}
+    
+    ## filter intact to contain only these genes
+    if dict_neighbors is None:
+        with report.stage('neighbors', method=m) as record:
+            dict_neighbors = network.neighbor_sets(genes)
+            record['items'] = len(dict_neighbors)
+    
+    ## Cohort specific ref (COSMIC) genes
+    cohort_ref_genes = set.intersection(set(reference_genes),set(genes),set(dict_neighbors))
+    cg_cg_genes = get_cg_cg_genes(cohort_specific_genes=genes, dict_neighbor=dict_neighbors, ref_genes=reference_genes)
+    print('Cosmic Genes:',len(cohort_ref_genes))
+    print('CG-CG:',len(cg_cg_genes))
+    
+
+    ## g is in cosmic and g has neighbors in PPI; both evaluations from one partition of the partners of g
+    ## genes are evaluated in work units, in parallel processes when gene_workers > 1, and merged in order
+    eval_genes = [g for g in dict_temp if g in reference_set and g in dict_neighbors]
+    streams = RandomStreams(seed).child(m)
+    sig_threshold = -np.log(pvalue_threshold)
+    done, iterations, replicates = {}, {}, {}
+    if checkpoint_dir is not None:
+        checkpoint = checkpoint_file(checkpoint_dir, m, reference, network_name)
+        params = checkpoint_params(m, reference, network_name, eval_genes, randiter=randiter, pvalue_threshold=pvalue_threshold,
+                                   seed=seed, common_random_numbers=common_random_numbers, exact=exact, adaptive=adaptive, bootstrap=bootstrap)
+        if resume:
+            done, iterations, replicates = load_checkpoint(checkpoint, params)
+            print('resumed genes:', len(done))
+        if not done:
+            clear_checkpoint(checkpoint)
+        shard = next_shard(checkpoint)
+    reused = 0
+    if kernel_cache is not None:
+        for g in eval_genes:
+            if g not in done and g in kernel_cache:
+                done[g], iterations[g], gene_replicates = kernel_cache[g]
+                if gene_replicates is not None:
+                    replicates[g] = gene_replicates
+                reused += 1
+    units = split_units([g for g in eval_genes if g not in done], gene_workers)
+    if checkpoint_dir is not None:
+        # small units, a shard of the checkpoint is saved whenever a unit completes
+        units = [unit[i:i+checkpoint_every] for unit in units for i in range(0, len(unit), checkpoint_every)]
+    tasks = [((unit, randiter, sig_threshold), dict(streams=streams, common_random_numbers=common_random_numbers, exact=exact, adaptive=adaptive, bootstrap=bootstrap))
+             for unit in units]
+    shared = dict(rows=dict_temp, dict_neighbors=dict_neighbors, reference_genes=reference_set)
+    mode = 'exact' if exact else 'adaptive' if adaptive is not None else randiter
+    with report.stage('kernel', method=m, reference=reference, network=network_name, randiter=mode, items=len(eval_genes)-len(done)) as record:
+        for unit_results in run_tasks(evaluate_reference_genes, tasks, workers=gene_workers, shared=shared):
+            for g, result_nnb, result_ncgnb, n, gene_replicates in unit_results:
+                done[g] = (result_nnb, result_ncgnb)
+                iterations[g] = n
+                if gene_replicates is not None:
+                    replicates[g] = gene_replicates
+            if checkpoint_dir is not None:
+                save_checkpoint(checkpoint, params, {r[0]: done[r[0]] for r in unit_results}, iterations, replicates, shard=shard)
+                shard += 1
+        record['iterations'] = int(sum(iterations.values()))
+        if adaptive is not None:
+            record['gene_iterations'] = {g: iterations[g] for g in eval_genes}
+        if kernel_cache is not None:
+            record['reused'] = reused
+            kernel_cache.update((g, (done[g], iterations[g], replicates.get(g))) for g in eval_genes)
+    results = [(g,) + done[g] for g in eval_genes]
+    dict_boot_nnb, dict_boot_ncgnb = {}, {}
+
+    for g, result_nnb, result_ncgnb in tqdm(results, total=len(eval_genes), desc='genes and neighbors'):
+        ### 1 with non neighbors
+        temp_pairs,temp_one, temp_two,temp_three,temp_four,temp_five,\
+        temp_six, temp_sumLHS, temp_sumsigLHS, temp_sumRHS,temp_sumsigRHS,\
+        temp_one_norm, temp_two_norm,temp_three_norm,temp_four_norm,temp_five_norm, temp_six_norm= result_nnb
+        if not np.isnan(temp_one):
+            if g in replicates and replicates[g][0] is not None:
+                dict_boot_nnb[g] = replicates[g][0]
+            dict_pairs_cgcg_for_nnb[g],dict_nnb_sigLHS_nonsigRHS[g], dict_nnb_sigLHS_sigRHS_LHS[g],dict_nnb_sigLHS_sigRHS_RHS[g],\
+            dict_nnb_nonsigLHS_nonsigRHS_LHS[g], dict_nnb_nonsigLHS_nonsigRHS_RHS[g],dict_nnb_nonsigLHS_sigRHS[g],\
+            dict_nnb_sum_LHS[g],dict_nnb_sum_sig_LHS[g],dict_nnb_sum_RHS[g],\
+            dict_nnb_sum_sig_RHS[g]= temp_pairs,temp_one, temp_two,temp_three,temp_four,temp_five,temp_six, temp_sumLHS,temp_sumsigLHS, temp_sumRHS,temp_sumsigRHS
+        
+            dict_norm_nnb_sigLHS_nonsigRHS[g], dict_norm_nnb_sigLHS_sigRHS_LHS[g],dict_norm_nnb_sigLHS_sigRHS_RHS[g],\
+            dict_norm_nnb_nonsigLHS_nonsigRHS_LHS[g], dict_norm_nnb_nonsigLHS_nonsigRHS_RHS[g],\
+            dict_norm_nnb_nonsigLHS_sigRHS[g]= temp_one_norm, temp_two_norm,temp_three_norm,temp_four_norm,temp_five_norm,temp_six_norm
+        
+        ## 2 with non cosmic neighbors
+        temp_pairs,temp_one, temp_two,temp_three,temp_four,temp_five,\
+        temp_six, temp_sumLHS, temp_sumsigLHS, temp_sumRHS,temp_sumsigRHS,\
+        temp_one_norm, temp_two_norm,temp_three_norm,temp_four_norm,temp_five_norm,\
+        temp_six_norm = result_ncgnb
+        if not np.isnan(temp_one):
+            if g in replicates and replicates[g][1] is not None:
+                dict_boot_ncgnb[g] = replicates[g][1]
+            dict_pairs_cgcg_for_ncgnb[g],dict_ncgnb_sigLHS_nonsigRHS[g], dict_ncgnb_sigLHS_sigRHS_LHS[g],dict_ncgnb_sigLHS_sigRHS_RHS[g],\
+            dict_ncgnb_nonsigLHS_nonsigRHS_LHS[g], dict_ncgnb_nonsigLHS_nonsigRHS_RHS[g],dict_ncgnb_nonsigLHS_sigRHS[g],\
+            dict_ncgnb_sum_LHS[g],dict_ncgnb_sum_sig_LHS[g],dict_ncgnb_sum_RHS[g],\
+            dict_ncgnb_sum_sig_RHS[g]= temp_pairs,temp_one, temp_two,temp_three,temp_four,temp_five,temp_six, temp_sumLHS, temp_sumsigLHS, temp_sumRHS,temp_sumsigRHS
+    
+            dict_norm_ncgnb_sigLHS_nonsigRHS[g], dict_norm_ncgnb_sigLHS_sigRHS_LHS[g],dict_norm_ncgnb_sigLHS_sigRHS_RHS[g],\
+            dict_norm_ncgnb_nonsigLHS_nonsigRHS_LHS[g], dict_norm_ncgnb_nonsigLHS_nonsigRHS_RHS[g],\
+            dict_norm_ncgnb_nonsigLHS_sigRHS[g]= temp_one_norm, temp_two_norm,temp_three_norm,temp_four_norm,temp_five_norm,temp_six_norm
+    
+            
+    for g in tqdm(dict_neighbors,desc='degrees'):
+        dict_neighbors_degree_all[g] = len([v for v in dict_neighbors[g]])
+        dict_neighbors_cg[g] = len([v for v in dict_neighbors[g] if v in reference_set])
+        dict_neighbors_ncg[g] = len([v for v in dict_neighbors[g] if v not in reference_set])
+        
+    bootstrap_result = (dict_boot_nnb, dict_boot_ncgnb) if bootstrap else ()
+    
+    return (len(cohort_ref_genes), len(cg_cg_genes),\
+    dict_neighbors_degree_all, dict_neighbors_cg, dict_neighbors_ncg, \
+    dict_pairs_cgcg_for_nnb,dict_pairs_cgcg_for_ncgnb,\
+    dict_nnb_sigLHS_nonsigRHS, dict_nnb_sigLHS_sigRHS_LHS,dict_nnb_sigLHS_sigRHS_RHS,\
+    dict_nnb_nonsigLHS_nonsigRHS_LHS, dict_nnb_nonsigLHS_nonsigRHS_RHS,dict_nnb_nonsigLHS_sigRHS,\
+    dict_nnb_sum_LHS,dict_nnb_sum_sig_LHS,dict_nnb_sum_RHS, dict_nnb_sum_sig_RHS,\
+    dict_norm_nnb_sigLHS_nonsigRHS, dict_norm_nnb_sigLHS_sigRHS_LHS,dict_norm_nnb_sigLHS_sigRHS_RHS,\
+    dict_norm_nnb_nonsigLHS_nonsigRHS_LHS, dict_norm_nnb_nonsigLHS_nonsigRHS_RHS,dict_norm_nnb_nonsigLHS_sigRHS,\
+    dict_ncgnb_sigLHS_nonsigRHS, dict_ncgnb_sigLHS_sigRHS_LHS,dict_ncgnb_sigLHS_sigRHS_RHS,\
+    dict_ncgnb_nonsigLHS_nonsigRHS_LHS, dict_ncgnb_nonsigLHS_nonsigRHS_RHS,dict_ncgnb_nonsigLHS_sigRHS,\
+    dict_ncgnb_sum_LHS,dict_ncgnb_sum_sig_LHS,dict_ncgnb_sum_RHS, dict_ncgnb_sum_sig_RHS,\
+    dict_norm_ncgnb_sigLHS_nonsigRHS, dict_norm_ncgnb_sigLHS_sigRHS_LHS,dict_norm_ncgnb_sigLHS_sigRHS_RHS,\
+    dict_norm_ncgnb_nonsigLHS_nonsigRHS_LHS, dict_norm_ncgnb_nonsigLHS_nonsigRHS_RHS,dict_norm_ncgnb_nonsigLHS_sigRHS) + bootstrap_result
+
+def bootstrap_errors(dict_boot, total_pairs):
+    '''
+    Bootstrap standard errors (columns COLS_SE) of the randomized statistics of an evaluation.
+    dict_boot: {g: (replicates, 8) array of kernels.bootstrap_medians}; the replicates of the
+    reference genes are summed, and every replicate gives the cases, Stat8 and the metrics.
+    '''
+    if not dict_boot:
+        return [np.nan]*len(COLS_SE)
+    total = np.sum(list(dict_boot.values()), axis=0)
+    case1, case2, case3, case4, case5, case6 = total[:, :6].T
+    TP = case1 + case2 + case3
+    FP = case2 + case3 + case6
+    TN = case1 + case4 + case5
+    FN = case4 + case5 + case6
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sensitivity = TP/(TP+FN)
+        specificity = TN/(TN+FP)
+        precision = TP/(TP+FP)
+        f1_score = 2*precision*sensitivity/(precision+sensitivity)
+        replicate_stats = [case1, case2, case3, case4, case5, case6, total[:, 6]/total_pairs,
+                           precision, sensitivity, specificity, f1_score]
+    return [np.std(v, ddof=1) if len(v) > 1 else np.nan for v in replicate_stats]
+
+
+def summarize_method(m, result):
+    '''
+    Summary rows of a method for evaluation 1 (columns COLS_SUM) and evaluation 2
+    (columns COLS_SUM_NCGNB).
+    result: return value of get_pvalues_single. When it carries bootstrap replicates, the
+    bootstrap standard errors (columns COLS_SE) are appended to both rows.
+    '''
+    cg_size,cg_cg_size, dict_neighbor_degree_all,dict_neighbor_cg, dict_neighbor_ncg, \
+    dict_pairs_cg_for_cgnnb,dict_pairs_cg_for_cgncgnb,\
+    dict_cgnnb_sigLHS_nonsigRHS, dict_cgnnb_sigLHS_sigRHS_LHS,dict_cgnnb_sigLHS_sigRHS_RHS,\
+    dict_cgnnb_nonsigLHS_nonsigRHS_LHS, dict_cgnnb_nonsigLHS_nonsigRHS_RHS,dict_cgnnb_nonsigLHS_sigRHS,\
+    dict_cgnnb_sum_LHS,dict_cgnnb_sumsig_LHS,dict_cgnnb_sum_RHS,dict_cgnnb_sumsig_RHS,\
+    dict_norm_cgnnb_sigLHS_nonsigRHS, dict_norm_cgnnb_sigLHS_sigRHS_LHS,dict_norm_cgnnb_sigLHS_sigRHS_RHS,\
+    dict_norm_cgnnb_nonsigLHS_nonsigRHS_LHS, dict_norm_cgnnb_nonsigLHS_nonsigRHS_RHS,dict_norm_cgnnb_nonsigLHS_sigRHS,\
+    dict_cgncgnb_sigLHS_nonsigRHS, dict_cgncgnb_sigLHS_sigRHS_LHS,dict_cgncgnb_sigLHS_sigRHS_RHS,\
+    dict_cgncgnb_nonsigLHS_nonsigRHS_LHS, dict_cgncgnb_nonsigLHS_nonsigRHS_RHS,dict_cgncgnb_nonsigLHS_sigRHS,\
+    dict_cgncgnb_sum_LHS,dict_cgncgnb_sumsig_LHS,dict_cgncgnb_sum_RHS,dict_cgncgnb_sumsig_RHS,\
+    dict_norm_cgncgnb_sigLHS_nonsigRHS, dict_norm_cgncgnb_sigLHS_sigRHS_LHS,dict_norm_cgncgnb_sigLHS_sigRHS_RHS,\
+    dict_norm_cgncgnb_nonsigLHS_nonsigRHS_LHS, dict_norm_cgncgnb_nonsigLHS_nonsigRHS_RHS,\
+    dict_norm_cgncgnb_nonsigLHS_sigRHS = result[:39]
+    bootstrap = result[39:]
+
+    ## for CGNB and CG NNB
+    case1_cgnnb = sum(dict_cgnnb_sigLHS_nonsigRHS.values())
+    case2_cgnnb = sum(dict_cgnnb_sigLHS_sigRHS_LHS.values())
+    case3_cgnnb = sum(dict_cgnnb_sigLHS_sigRHS_RHS.values())
+    case4_cgnnb = sum(dict_cgnnb_nonsigLHS_nonsigRHS_LHS.values())
+    case5_cgnnb = sum(dict_cgnnb_nonsigLHS_nonsigRHS_RHS.values())
+    case6_cgnnb = sum(dict_cgnnb_nonsigLHS_sigRHS.values())
+    sumsig_LHS_cgnnb = sum(dict_cgnnb_sumsig_LHS.values())
+    sum_LHS_cgnnb = sum(dict_cgnnb_sum_LHS.values())
+    medsig_LHS_cgnnb = np.median(list(dict_cgnnb_sumsig_LHS.values())) 
+    sumsig_RHS_cgnnb = sum(dict_cgnnb_sumsig_RHS.values())
+    sum_RHS_cgnnb = sum(dict_cgnnb_sum_RHS.values()) 
+    medsig_RHS_cgnnb = np.median(list(dict_cgnnb_sumsig_RHS.values()))
+    
+    TP_cgnnb = case1_cgnnb + case2_cgnnb +case3_cgnnb 
+    FP_cgnnb = case2_cgnnb + case3_cgnnb +case6_cgnnb
+    TN_cgnnb = case1_cgnnb + case4_cgnnb +case5_cgnnb 
+    FN_cgnnb = case4_cgnnb + case5_cgnnb +case6_cgnnb
+    sensitivity_cgnnb = TP_cgnnb/(TP_cgnnb+FN_cgnnb) 
+    specificity_cgnnb = TN_cgnnb/(TN_cgnnb+FP_cgnnb)
+    precision_cgnnb = TP_cgnnb/(TP_cgnnb+FP_cgnnb)
+    f1_score_cgnnb = 2*precision_cgnnb*sensitivity_cgnnb/(precision_cgnnb+sensitivity_cgnnb)
+
+    total_cg_pairs_for_nnb = np.sum(list(dict_pairs_cg_for_cgnnb.values()))
+    row_cgnnb = ([m,total_cg_pairs_for_nnb]
+        + [case1_cgnnb, case2_cgnnb,case3_cgnnb, case4_cgnnb, case5_cgnnb, case6_cgnnb,\
+           case1_cgnnb + case2_cgnnb, case3_cgnnb + case6_cgnnb,\
+           sum_LHS_cgnnb,sumsig_LHS_cgnnb,sum_LHS_cgnnb/total_cg_pairs_for_nnb,sum_RHS_cgnnb/total_cg_pairs_for_nnb,\
+           sum_RHS_cgnnb,sumsig_RHS_cgnnb,\
+          TP_cgnnb,FP_cgnnb,TN_cgnnb,FN_cgnnb, precision_cgnnb,sensitivity_cgnnb, specificity_cgnnb, f1_score_cgnnb])
+    
+
+    ## for CGNB and NCG NB
+
+    case1_cgncgnb = sum(dict_cgncgnb_sigLHS_nonsigRHS.values())
+    case2_cgncgnb = sum(dict_cgncgnb_sigLHS_sigRHS_LHS.values())
+    case3_cgncgnb = sum(dict_cgncgnb_sigLHS_sigRHS_RHS.values())
+    case4_cgncgnb = sum(dict_cgncgnb_nonsigLHS_nonsigRHS_LHS.values())
+    case5_cgncgnb = sum(dict_cgncgnb_nonsigLHS_nonsigRHS_RHS.values())
+    case6_cgncgnb = sum(dict_cgncgnb_nonsigLHS_sigRHS.values())
+    sumsig_LHS_cgncgnb = sum(dict_cgncgnb_sumsig_LHS.values())
+    sum_LHS_cgncgnb = sum(dict_cgncgnb_sum_LHS.values())
+    medsig_LHS_cgncgnb = np.median(list(dict_cgncgnb_sumsig_LHS.values()))
+    sumsig_RHS_cgncgnb = sum(dict_cgncgnb_sumsig_RHS.values())
+    sum_RHS_cgncgnb = sum(dict_cgncgnb_sum_RHS.values())
+    medsig_RHS_cgncgnb = np.median(list(dict_cgncgnb_sumsig_RHS.values()))
+    
+    TP_cgncgnb = case1_cgncgnb + case2_cgncgnb +case3_cgncgnb 
+    FP_cgncgnb = case2_cgncgnb + case3_cgncgnb +case6_cgncgnb
+    TN_cgncgnb = case1_cgncgnb + case4_cgncgnb +case5_cgncgnb 
+    FN_cgncgnb = case4_cgncgnb + case5_cgncgnb +case6_cgncgnb
+    sensitivity_cgncgnb = TP_cgncgnb/(TP_cgncgnb+FN_cgncgnb)
+    specificity_cgncgnb = TN_cgncgnb/(TN_cgncgnb+FP_cgncgnb)
+    precision_cgncgnb = TP_cgncgnb/(TP_cgncgnb+FP_cgncgnb)
+    f1_score_cgncgnb = 2*precision_cgncgnb*sensitivity_cgncgnb/(precision_cgncgnb+sensitivity_cgncgnb)
+ 
+    total_cg_pairs_for_ncgnb = np.sum(list(dict_pairs_cg_for_cgncgnb.values()))
+
+    row_cgncgnb = ([m,total_cg_pairs_for_ncgnb]
+        + [case1_cgncgnb, case2_cgncgnb,case3_cgncgnb, case4_cgncgnb, case5_cgncgnb, case6_cgncgnb,\
+           case1_cgncgnb + case2_cgncgnb, case3_cgncgnb + case6_cgncgnb,\
+           sum_LHS_cgncgnb,sumsig_LHS_cgncgnb,sum_LHS_cgncgnb/total_cg_pairs_for_ncgnb,sum_RHS_cgncgnb/total_cg_pairs_for_ncgnb,\
+           sum_RHS_cgncgnb, sumsig_RHS_cgncgnb,\
+          TP_cgncgnb,FP_cgncgnb,TN_cgncgnb,FN_cgncgnb,precision_cgncgnb,sensitivity_cgncgnb, specificity_cgncgnb,f1_score_cgncgnb])
+
+    if bootstrap:
+        dict_boot_cgnnb, dict_boot_cgncgnb = bootstrap
+        row_cgnnb += bootstrap_errors(dict_boot_cgnnb, total_cg_pairs_for_nnb)
+        row_cgncgnb += bootstrap_errors(dict_boot_cgncgnb, total_cg_pairs_for_ncgnb)
+
+    return row_cgnnb, row_cgncgnb
+
+
+def transaction(df):
+    """
+    Changing the format of the table in accordance with the article.
+    df : Dataframe containing the result table.
+    df1_new : The final dataframe after format conversion is done.
+    """
+    columns = df.columns.tolist()
+    columns = columns[:1]+columns[2:8]+columns[12:14]+columns[-4:]
+    new_cols = ['Method', 'Stat1','Stat2','Stat3','Stat4','Stat5','Stat6', 'Stat7', 'Stat8', 'Precision', 'Sensitivity', 'Specificity', 'F1 Score']
+    decimals = pd.Series([0,1,1,1,1,1,1,3,3, 3,3,3,3], index=columns)
+    df1_new = df[columns].round(decimals)
+    df1_new.columns = new_cols
+    
+    for idx, row in df1_new.iterrows():
+        m = row['Method']
+        df1_new.at[idx,'Method']=METHOD_NAMES[m]
+        
+    return df1_new
+
+
+def summary_tables(rows_cgnnb, rows_cgncgnb):
+    '''
+    tables of both evaluations in the article format, one row per method; rows with
+    bootstrap standard errors get the COLS_SE columns after the article columns
+    '''
+    tables = []
+    for rows, columns in ((rows_cgnnb, COLS_SUM), (rows_cgncgnb, COLS_SUM_NCGNB)):
+        df_summary = transaction(pd.DataFrame([row[:len(columns)] for row in rows], columns = columns))
+        if rows and len(rows[0]) > len(columns):
+            df_errors = pd.DataFrame([row[len(columns):] for row in rows], columns = COLS_SE).round(3)
+            df_summary = pd.concat([df_summary, df_errors], axis=1)
+        tables.append(df_summary)
+
+    return tuple(tables)
+
+
+def evaluate_networks_single(table, m, reference_sets, networks, names=None, pvalue_position=3, report=None, **kwargs):
+    '''
+    get_pvalues_single of a method for several networks and reference sets. The result file is
+    read and the -log p rows are built once for all of them, the neighbor sets once per network.
+    reference_sets: netcentric.reference.ReferenceSets, names: the sets to evaluate (all by default),
+    networks: {network name: netcentric.network.Network}.
+    Returns {network name: {set name: result of get_pvalues_single}}.
+    '''
+    if report is None:
+        report = RunReport()
+    names = list(reference_sets) if names is None else names
+    if isinstance(table, str):
+        with report.stage('parse', method=m) as record:
+            table = load_pair_table(table, m, pvalue_position=pvalue_position)
+            record['items'] = len(table)
+    with report.stage('rows', method=m) as record:
+        rows = table.rows(reference_sets.union(names))
+        record['items'] = len(rows)
+
+    out = {}
+    for network_name, network in networks.items():
+        with report.stage('neighbors', method=m, network=network_name) as record:
+            dict_neighbors = network.neighbor_sets(table.genes)
+            record['items'] = len(dict_neighbors)
+        out[network_name] = {name: get_pvalues_single(table, m, reference_sets.member_set(name), network, pvalue_position=pvalue_position,
+                                                      report=report, rows=rows, dict_neighbors=dict_neighbors, reference=name,
+                                                      network_name=network_name, **kwargs)
+                             for name in names}
+    return out
+
+
+def evaluate_reference_sets_single(table, m, reference_sets, network, names=None, pvalue_position=3, report=None, **kwargs):
+    '''
+    get_pvalues_single of a method for several reference sets on one network,
+    evaluate_networks_single for a single network. Returns {name: result of get_pvalues_single}.
+    '''
+    return evaluate_networks_single(table, m, reference_sets, {None: network}, names=names, pvalue_position=pvalue_position,
+                                    report=report, **kwargs)[None]
+
+
+def _evaluate_method(m, tables, profile_dir=None, **kwargs):
+    '''evaluate_networks_single with its own stage records, returned with the result so they also come back from worker processes'''
+    method_report = RunReport(profile_dir=profile_dir)
+    result = evaluate_networks_single(tables[m], m, report=method_report, **kwargs)
+    return result, method_report.stages
+
+
+def _summarize_results(methods, method_results, keys, report):
+    '''
+    Summary tables of several configurations (keys) of methods.
+    method_results: ({key: result of get_pvalues_single}, stage records) per method, in order of methods.
+    Returns {key: (table of evaluation 1, table of evaluation 2, {method: result of get_pvalues_single})}.
+    '''
+    results = {key: {} for key in keys}
+    rows_cgnnb = {key: [] for key in keys}
+    rows_cgncgnb = {key: [] for key in keys}
+    for m, (result, stages) in zip(tqdm(methods), method_results):
+        print(m)
+        report.extend(stages)
+        for key in keys:
+            results[key][m] = result[key]
+            row_cgnnb, row_cgncgnb = summarize_method(m, result[key])
+            rows_cgnnb[key].append(row_cgnnb)
+            rows_cgncgnb[key].append(row_cgncgnb)
+        print()
+
+    with report.stage('summary', items=len(methods)*len(keys)):
+        return {key: summary_tables(rows_cgnnb[key], rows_cgncgnb[key]) + (results[key],) for key in keys}
+
+
+def evaluate_networks(methods, tables, reference_sets, networks, names=None, workers=1, report=None, **kwargs):
+    '''
+    Evaluate methods on several networks against several reference gene sets and summarize them.
+    tables: {method: PairTable or result file},
+    reference_sets: netcentric.reference.ReferenceSets, names: the sets to evaluate (all by default),
+    networks: {network name: netcentric.network.Network},
+    workers: number of processes, methods are evaluated in parallel,
+    report: RunReport receiving the stage timings of all methods,
+    kwargs: further arguments of get_pvalues_single (pvalue_threshold, randiter, seed, ...).
+
+    Returns {network name: {set name: (table of evaluation 1, table of evaluation 2, {method: result of get_pvalues_single})}},
+    the tables in the article format. Every network and reference set gives the same tables as
+    when evaluated alone.
+    '''
+    if report is None:
+        report = RunReport()
+    names = list(reference_sets) if names is None else names
+    keys = [(network_name, name) for network_name in networks for name in names]
+    tasks = [((m,), dict(kwargs)) for m in methods]
+    shared = dict(tables=tables, reference_sets=reference_sets, names=names, networks=networks, profile_dir=report.profile_dir)
+
+    # methods run in parallel processes when workers > 1, results come back in order of methods
+    method_results = (({(network_name, name): result[network_name][name] for network_name, name in keys}, stages)
+                      for result, stages in run_tasks(_evaluate_method, tasks, workers=workers, shared=shared))
+    summaries = _summarize_results(methods, method_results, keys, report)
+
+    out = {network_name: {} for network_name in networks}
+    for network_name, name in keys:
+        out[network_name][name] = summaries[network_name, name]
+
+    return out
+
+
+def evaluate_reference_sets(methods, tables, reference_sets, network, names=None, workers=1, report=None, **kwargs):
+    '''
+    Evaluate methods against several reference gene sets on one network, evaluate_networks for
+    a single network. Returns {name: (table of evaluation 1, table of evaluation 2, {method: result of get_pvalues_single})}.
+    '''
+    return evaluate_networks(methods, tables, reference_sets, {None: network}, names=names, workers=workers,
+                             report=report, **kwargs)[None]
+
+
+def evaluate_methods(methods, tables, reference_genes, network, workers=1, report=None, **kwargs):
+    '''
+    Evaluate methods and summarize them, evaluate_reference_sets for a single list of
+    reference genes. Returns the tables of evaluation 1 and 2 in the article format and
+    a dictionary {method: result of get_pvalues_single}.
+    '''
+    reference_sets = ReferenceSets()
+    reference_sets.add('reference', reference_genes)
+    return evaluate_reference_sets(methods, tables, reference_sets, network, workers=workers, report=report, **kwargs)['reference']
+
+
+def sweep_thresholds_single(table, m, reference_genes, network, thresholds, pvalue_position=3, report=None, **kwargs):
+    '''
+    get_pvalues_single of a method on the networks of the edges of network with confidence >= threshold,
+    for every threshold (netcentric.network.threshold_neighbor_sets). The result file is read and the
+    -log p rows are built once. From one threshold to the next only the reference genes whose neighbor
+    sets changed are evaluated again, so every threshold gives the same result as when evaluated alone.
+    Returns {threshold: result of get_pvalues_single}.
+    '''
+    if report is None:
+        report = RunReport()
+    if isinstance(table, str):
+        with report.stage('parse', method=m) as record:
+            table = load_pair_table(table, m, pvalue_position=pvalue_position)
+            record['items'] = len(table)
+    with report.stage('rows', method=m) as record:
+        rows = table.rows(reference_genes)
+        record['items'] = len(rows)
+
+    out = {}
+    kernel_cache = {}
+    sweep = threshold_neighbor_sets(network, table.genes, thresholds)
+    for threshold in sorted(thresholds):
+        with report.stage('neighbors', method=m, network=threshold) as record:
+            _, dict_neighbors, changed = next(sweep)
+            record['items'] = len(changed)
+        for g in changed:
+            kernel_cache.pop(g, None)
+        out[threshold] = get_pvalues_single(table, m, reference_genes, network, pvalue_position=pvalue_position, report=report,
+                                            rows=rows, dict_neighbors=dict_neighbors, network_name=threshold,
+                                            kernel_cache=kernel_cache, **kwargs)
+    return out
+
+
+def _sweep_method(m, tables, profile_dir=None, **kwargs):
+    '''sweep_thresholds_single with its own stage records, as _evaluate_method'''
+    method_report = RunReport(profile_dir=profile_dir)
+    result = sweep_thresholds_single(tables[m], m, report=method_report, **kwargs)
+    return result, method_report.stages
+
+
+def evaluate_threshold_sweep(methods, tables, reference_genes, network, thresholds, workers=1, report=None, **kwargs):
+    '''
+    Evaluate methods on the networks of the edges of network (e.g. a tissue specific network) with
+    confidence >= threshold for several thresholds, and summarize them (see sweep_thresholds_single).
+    Returns {threshold: (table of evaluation 1, table of evaluation 2, {method: result of get_pvalues_single})}.
+    '''
+    if report is None:
+        report = RunReport()
+    thresholds = sorted(thresholds)
+    tasks = [((m,), dict(kwargs)) for m in methods]
+    shared = dict(tables=tables, reference_genes=reference_genes, network=network, thresholds=thresholds, profile_dir=report.profile_dir)
+    return _summarize_results(methods, run_tasks(_sweep_method, tasks, workers=workers, shared=shared), thresholds, report)
@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+"""
+Experiment grid: the product of cancer types, thresholds, networks, reference sets
+and TSN settings over the scripts of src/, run as cells of a process pool.
+
+A cell is one call of a script's main with its command line. Before anything runs,
+the input files of every cell are checked, and cells whose outputs are newer than
+all of their inputs are skipped. Cells of the same cancer type and threshold read
+the same result tables, so they form one group: the cells of a group run one after
+another in one process with one DataLoader, the groups run in parallel.
+Output paths are relative to src/, as for the scripts themselves.
+"""
+
+import importlib
+import json
+import os
+import time
+import traceback
+from collections import OrderedDict
+
+from netcentric.datasets import CGC_FILE, DATA_DIR, NETWORK_FILES, REFERENCE_FILES, TISSUES, DataLoader
+from netcentric.parallel import run_tasks
+from netcentric.report import RunReport, peak_rss_mb, peak_rss_scope
+from netcentric.streams import MASTER_SEED
+
+SCRIPTS = ['evaluations_on_metrics', 'evaluations_via_tsn', 'evaluations_via_mla',
+           'evaluations_via_mla_neighbors', 'me_on_tsn_ntsn_roc_curve']
+
+DEFAULT_CONFIG = {'cancer_types': sorted(TISSUES),
+                  'thresholds': [5, 10, 20],
+                  'methods': ['discover', 'discover_strat', 'fishers', 'megsa', 'memo', 'wext'],
+                  'randiter': 100,
+                  'exact': False,
+                  'adaptive': False,
+                  'bootstrap': 0,
+                  'pvalue_threshold': 0.05,
+                  'networks': 'all',
+                  'references': sorted(REFERENCE_FILES),
+                  'tsn_thresholds': [0.0],
+                  'roc_percentages': [0.25],
+                  'scripts': SCRIPTS,
+                  'cell_workers': 1,
+                  'seed': MASTER_SEED}
+
+
+class Cell(object):
+    '''
+    One script run of the grid.
+    script: module name of the script in src/, argv: its command line,
+    inputs, outputs: files read and written by the run,
+    group: key of the cells sharing its inputs, (cancer type, threshold).
+    '''
+
+    def __init__(self, script, argv, inputs, outputs, group):
+        self.script = script
+        self.argv = [str(a) for a in argv]
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.group = group
+
+    def __repr__(self):
+        return 'Cell({})'.format(' '.join([self.script + '.py'] + self.argv))
+
+    def missing_inputs(self):
+        return [f for f in self.inputs if not os.path.exists(f)]
+
+    def up_to_date(self):
+        '''all outputs exist and none is older than an input'''
+        if not self.outputs or not all(os.path.exists(f) for f in self.outputs):
+            return False
+        newest_input = max([os.path.getmtime(f) for f in self.inputs] or [0])
+        return min(os.path.getmtime(f) for f in self.outputs) >= newest_input
+
+
+def load_config(config_file=None, **overrides):
+    '''grid configuration of a JSON file, missing keys take DEFAULT_CONFIG'''
+    config = dict(DEFAULT_CONFIG)
+    if config_file is not None:
+        with open(config_file) as f:
+            config.update(json.load(f))
+    config.update(overrides)
+    unknown = set(config) - set(DEFAULT_CONFIG)
+    if unknown:
+        raise ValueError('unknown grid keys: {}'.format(', '.join(sorted(unknown))))
+    return config
+
+
+def _networks(config):
+    if config['networks'] == 'all':
+        return list(NETWORK_FILES)
+    networks = [tuple(n) for n in config['networks']]
+    for n in networks:
+        if n not in NETWORK_FILES:
+            raise ValueError('unknown network {} {}'.format(*n))
+    return networks
+
+
+def expand_grid(config, loader=None):
+    '''
+    Cells of a configuration (see DEFAULT_CONFIG), in order of cancer type, threshold and script.
+    evaluations_on_metrics.py evaluates all networks and reference sets of a cancer type and
+    threshold in one cell. Raises ValueError when two cells would write the same output.
+    '''
+    loader = loader or DataLoader()
+    networks = _networks(config)
+    refs = list(config['references'])
+    for ref in refs:
+        if ref not in REFERENCE_FILES:
+            raise ValueError('unknown reference genes {}'.format(ref))
+    for script in config['scripts']:
+        if script not in SCRIPTS:
+            raise ValueError('unknown script {}'.format(script))
+
+    methods = list(config['methods'])
+    mode_args = ['--exact'] if config['exact'] else ['-ad'] if config['adaptive'] else []
+    if config['exact'] and config['bootstrap']:
+        raise ValueError('exact runs have no random draws to bootstrap')
+    if config['bootstrap']:
+        mode_args += ['-b', config['bootstrap']]
+    mode = 'exact' if config['exact'] else 'adaptive' if config['adaptive'] else None
+    cells = []
+    for c in config['cancer_types']:
+        tissue = TISSUES[c]
+        for t in config['thresholds']:
+            group = (c, t)
+            dict_infile, dict_infile_intact = loader.result_files(methods, c, t)
+            result_files = [dict_infile[m] for m in methods]
+            common = ['-c', c, '-t', t, '-m'] + methods
+
+            for script in config['scripts']:
+                if script == 'evaluations_on_metrics':
+                    p = float(config['pvalue_threshold'])
+                    run_name = '{}_t{}_{}_{}_{}'.format(c, t, p, mode or config['randiter'], '_'.join(methods))
+                    argv = common + mode_args + ['-i', config['randiter'], '-p', p, '-ni'] + [n[0] for n in networks] + ['-e'] + [n[1] for n in networks] \
+                        + ['-r'] + refs + ['-w', config['cell_workers'], '-s', config['seed']]
+                    inputs = result_files + [loader.path(f) for n in networks for f in n] + [loader.path('known_cancer_genes', r) for r in refs]
+                    outputs = ['../ME_results/{}{}/{}/{}.txt'.format(NETWORK_FILES[n], REFERENCE_FILES[r], folder, run_name)
+                               for n in networks for r in refs
+                               for folder in ('results_counts_eval1_cgcg_cgnnb_tpfp', 'results_counts_eval2_cgcg_cgncgnb_tpfp')]
+                    cells.append(Cell(script, argv, inputs, outputs, group))
+
+                elif script == 'evaluations_via_tsn':
+                    for th in config['tsn_thresholds']:
+                        argv = common + mode_args + ['-ti', tissue, '-th', th, '-w', config['cell_workers'], '-s', config['seed']]
+                        inputs = result_files + [loader.tsn_file(tissue, float(th)), loader.path('known_cancer_genes', CGC_FILE)]
+                        outputs = ['../tsn_results/{}/{}_t{}_{}.txt'.format(folder, c, t, '_'.join(([mode] if mode else []) + methods))
+                                   for folder in ('results_counts_eval1_tsn', 'results_counts_eval2_tsn')]
+                        cells.append(Cell(script, argv, inputs, outputs, group))
+
+                elif script in ('evaluations_via_mla', 'evaluations_via_mla_neighbors'):
+                    folder = 'percent_sig_figures' if script == 'evaluations_via_mla' else 'perc_sig_figures_for_multiple_neighbors'
+                    argv = common + ['-s', config['seed']]
+                    inputs = result_files + [dict_infile_intact[m] for m in methods] \
+                        + [loader.path('MLA_ep_mutation_filtered_all_genes', '{}_MLA_standardized.txt'.format(c)),
+                           loader.path('known_cancer_genes', CGC_FILE)]
+                    outputs = ['../MLA_results/{}/{}_t{}_percsig_random_fig.pdf'.format(folder, c, t)]
+                    cells.append(Cell(script, argv, inputs, outputs, group))
+
+                elif script == 'me_on_tsn_ntsn_roc_curve':
+                    for th in config['tsn_thresholds']:
+                        for perc in config['roc_percentages']:
+                            argv = common + ['-th', th, '-p', perc, '-s', config['seed']]
+                            inputs = result_files + [loader.tsn_file(tissue, float(th)), loader.path('known_cancer_genes', CGC_FILE),
+                                                     loader.path('binary_matrices_all_genes_ep_mutation_filtered', c + '_TML_binary_sm.txt')]
+                            outputs = ['../tsn_results/figure_tsn_AUROC/{}_t{}_tsn_auroc.pdf'.format(c, t)]
+                            cells.append(Cell(script, argv, inputs, outputs, group))
+
+    written = {}
+    for cell in cells:
+        for f in cell.outputs:
+            if f in written:
+                raise ValueError('{} and {} both write {}'.format(written[f], cell, f))
+            written[f] = cell
+    return cells
+
+
+def preflight(cells):
+    '''{missing input file: cells reading it}, empty when every input exists'''
+    missing = OrderedDict()
+    for cell in cells:
+        for f in cell.missing_inputs():
+            missing.setdefault(f, []).append(cell)
+    return missing
+
+
+def group_cells(cells):
+    '''cells by group, in order of first appearance'''
+    groups = OrderedDict()
+    for cell in cells:
+        groups.setdefault(cell.group, []).append(cell)
+    return list(groups.values())
+
+
+def run_group(cells, data_dir=DATA_DIR, use_cache=True):
+    '''
+    Run the cells of a group in order with one DataLoader. Returns a record per cell with
+    its wall time, its own peak RSS and that of the process so far, and its status, 'done' or 'failed' with the error.
+    '''
+    loader = DataLoader(data_dir, use_cache=use_cache)
+    records = []
+    for cell in cells:
+        record = dict(stage='cell', script=cell.script, cancer_type=cell.group[0], t=cell.group[1], argv=' '.join(cell.argv))
+        start = time.perf_counter()
+        with peak_rss_scope() as peak:
+            try:
+                importlib.import_module(cell.script).main(cell.argv, loader=loader)
+                record['status'] = 'done'
+            except Exception:
+                record['status'] = 'failed'
+                record['error'] = traceback.format_exc()
+        record['wall_s'] = time.perf_counter() - start
+        record['peak_rss_mb'] = peak['peak_rss_mb']
+        record['process_peak_rss_mb'] = peak_rss_mb()
+        records.append(record)
+    return records
+
+
+def run_grid(cells, workers=1, force=False, report=None, data_dir=DATA_DIR, use_cache=True):
+    '''
+    Run the cells that are not up to date (all of them with force), the groups in up to
+    workers processes. report: RunReport receiving one record per cell, skipped cells
+    with status 'up_to_date'. Returns the report.
+    '''
+    if report is None:
+        report = RunReport()
+    todo = []
+    for cell in cells:
+        if not force and cell.up_to_date():
+            report.add('cell', 0.0, script=cell.script, cancer_type=cell.group[0], t=cell.group[1],
+                       argv=' '.join(cell.argv), status='up_to_date')
+        else:
+            todo.append(cell)
+
+    tasks = [((group,), {}) for group in group_cells(todo)]
+    for records in run_tasks(run_group, tasks, workers=workers, shared=dict(data_dir=data_dir, use_cache=use_cache)):
+        for record in records:
+            print(record['status'], record['script'], record['argv'], '{:.1f}s'.format(record['wall_s']))
+        report.extend(records)
+    return report
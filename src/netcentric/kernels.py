@@ -0,0 +1,351 @@
+# -*- coding: utf-8 -*-
+"""
+Randomization kernels shared by the evaluation scripts.
+
+The six cases compare the -log p-value of a CGC-CGC neighbor pair (LHS) with the
+-log p-value of a randomly drawn control pair (RHS):
+    1: sig LHS, non sig RHS
+    2: sig LHS, sig RHS, LHS > RHS
+    3: sig LHS, sig RHS, LHS <= RHS
+    4: non sig LHS, non sig RHS, LHS > RHS
+    5: non sig LHS, non sig RHS, LHS <= RHS
+    6: non sig LHS, sig RHS
+
+With exact=True the controls are not drawn: the case counts of an iteration are
+sums of independent Bernoulli variables (one per CGC-CGC pair, with the fraction of
+the control pool falling in the case), their distributions are computed by
+convolution and their medians reported, and the RHS sums are reported by their
+expectations.
+"""
+
+import numpy as np
+
+NAN_RESULT = (np.nan,)*17
+
+
+def uniforms_to_indices(u, n):
+    '''Map uniform numbers in [0, 1) to indices in [0, n).'''
+    return np.minimum((u*n).astype(np.intp), n-1)
+
+
+def iteration_case_counts(lhs, rhs, sig_threshold):
+    '''
+    Case counts and RHS sums of every iteration.
+    lhs: -log p-values of the CGC-CGC neighbor pairs,
+    rhs: -log p-values of the drawn control pairs, of shape (number of CGC-CGC pairs, iterations),
+    sig_threshold: significance threshold for -log p-values.
+    Returns an array of shape (8, iterations): the counts of cases 1-6, the sum of the RHS
+    and the sum of the significant RHS.
+    '''
+    lhs_col = np.asarray(lhs, dtype=float)[:, None]
+
+    sig_lhs = lhs_col > sig_threshold
+    nonsig_rhs_for_sig = rhs < sig_threshold
+    sig_rhs_for_nonsig = rhs > sig_threshold
+    lhs_greater = lhs_col > rhs
+
+    case1 = sig_lhs & nonsig_rhs_for_sig
+    sig_sig = sig_lhs & ~nonsig_rhs_for_sig
+    case2 = sig_sig & lhs_greater
+    case3 = sig_sig & ~lhs_greater
+    case6 = ~sig_lhs & sig_rhs_for_nonsig
+    nonsig_nonsig = ~sig_lhs & ~sig_rhs_for_nonsig
+    case4 = nonsig_nonsig & lhs_greater
+    case5 = nonsig_nonsig & ~lhs_greater
+
+    # cumulative sums add the pairs in order, as the sequential loop does
+    sum_RHS = np.cumsum(rhs, axis=0)[-1]
+    sig_sum_RHS = np.cumsum(np.where(sig_sig | case6, rhs, 0.0), axis=0)[-1]
+
+    return np.array([case.sum(axis=0) for case in (case1, case2, case3, case4, case5, case6)] + [sum_RHS, sig_sum_RHS])
+
+
+def summarize_iterations(lhs, stats, n_neighbors, sig_threshold):
+    '''
+    17-tuple of the evaluation functions from the iteration_case_counts of all iterations:
+    number of CGC-CGC pairs, medians of cases 1-6, LHS sums, medians of RHS sums and
+    normalized medians.
+    '''
+    lhs_values = list(lhs)
+    medians = [np.median(stats[i]) for i in range(6)]
+    norm = [v/float(n_neighbors) for v in medians]
+
+    sig_sum_LHS = np.sum([v for v in lhs_values if v > sig_threshold])
+    sum_LHS = np.sum(lhs_values)
+
+    return tuple([len(lhs_values)] + medians + [sum_LHS, sig_sum_LHS, np.median(stats[6]), np.median(stats[7])] + norm)
+
+
+def bootstrap_medians(stats, replicates, generator):
+    '''
+    Bootstrap replicates of the medians of iteration_case_counts, the iterations resampled
+    with replacement. generator: numpy Generator.
+    Returns an array of shape (replicates, 8): medians of cases 1-6 and of the RHS sums.
+    '''
+    n = stats.shape[1]
+    idx = generator.integers(0, n, size=(replicates, n))
+    return np.median(stats[:, idx], axis=2).T
+
+
+def randomized_case_counts(lhs, rhs_pool, n_neighbors, sig_threshold, idx):
+    '''
+    Batched randomization for one reference gene.
+    lhs: -log p-values of the CGC-CGC neighbor pairs,
+    rhs_pool: -log p-values of the control pairs,
+    n_neighbors: number of neighbors of the gene, used for normalization,
+    sig_threshold: significance threshold for -log p-values,
+    idx: control indices of shape (randiter, number of CGC-CGC pairs).
+
+    For every iteration one control pair is drawn for each CGC-CGC pair.
+    Returns the 17-tuple of the evaluation functions: number of CGC-CGC pairs,
+    medians of cases 1-6, LHS sums, medians of RHS sums and normalized medians.
+    '''
+    lhs = list(lhs)
+    rhs_pool = np.asarray(rhs_pool, dtype=float)
+
+    # rows of idx are iterations, one control per CGC-CGC pair; rows of the controls are pairs
+    stats = iteration_case_counts(lhs, rhs_pool[idx.T], sig_threshold)
+
+    return summarize_iterations(lhs, stats, n_neighbors, sig_threshold)
+
+
+class AdaptiveIterations(object):
+    '''
+    Stopping rule of the adaptive iteration count of a reference gene.
+    Iterations are drawn in batches, min_iter first and then batch at a time, until the
+    medians of cases 1-6 and of the RHS sums of both evaluations change by at most tol
+    (relative, absolute below 1) from one batch to the next, or max_iter are drawn.
+    '''
+
+    def __init__(self, min_iter=20, max_iter=1000, batch=20, tol=0.01):
+        self.min_iter = min_iter
+        self.max_iter = max_iter
+        self.batch = batch
+        self.tol = tol
+
+    def __repr__(self):
+        return 'AdaptiveIterations(min_iter={}, max_iter={}, batch={}, tol={})'.format(self.min_iter, self.max_iter, self.batch, self.tol)
+
+    def next_batch(self, n):
+        '''number of iterations to draw after n'''
+        return min(self.min_iter if n == 0 else self.batch, self.max_iter - n)
+
+    def converged(self, previous, current):
+        return bool(np.all(np.abs(current - previous) <= self.tol*np.maximum(np.abs(previous), 1.0)))
+
+
+def poisson_binomial_pmf(p):
+    '''
+    Distributions of sums of independent Bernoulli variables.
+    p: success probabilities of shape (number of sums, number of variables).
+    Returns the probabilities of 0..number of variables successes, one row per sum.
+    '''
+    p = np.atleast_2d(np.asarray(p, dtype=float))
+    pmf = np.zeros((p.shape[0], p.shape[1] + 1))
+    pmf[:, 0] = 1.0
+    for i in range(p.shape[1]):
+        q = p[:, i:i+1]
+        pmf[:, 1:i+2] = pmf[:, 1:i+2]*(1.0 - q) + pmf[:, :i+1]*q
+        pmf[:, 0] *= 1.0 - q[:, 0]
+    return pmf
+
+
+def discrete_median(pmf, tol=1e-12):
+    '''
+    Median of a distribution on 0, 1, 2, ..., the mean of the two middle values when the
+    distribution function is exactly 1/2 at the lower one, as np.median of an even sample.
+    '''
+    cdf = np.cumsum(pmf)
+    m = int(np.searchsorted(cdf, 0.5 - tol))
+    if abs(cdf[m] - 0.5) <= tol:
+        upper = np.flatnonzero(pmf[m+1:] > tol)
+        if len(upper):
+            return np.float64(m + m + 1 + upper[0])/2.0
+    return np.float64(m)
+
+
+def exact_case_counts(lhs, rhs_pool, n_neighbors, sig_threshold):
+    '''
+    randomized_case_counts without drawing: the same 17-tuple with the exact medians of
+    the case counts and the expected RHS sums of an iteration.
+    '''
+    lhs_values = list(lhs)
+    lhs = np.asarray(lhs_values, dtype=float)
+    rhs = np.asarray(rhs_pool, dtype=float)[None, :]
+    k = len(lhs)
+    lhs_col = lhs[:, None]
+
+    # the case of every (CGC-CGC pair, control pair), as in randomized_case_counts
+    sig_lhs = lhs_col > sig_threshold
+    nonsig_rhs_for_sig = rhs < sig_threshold
+    sig_rhs_for_nonsig = rhs > sig_threshold
+    lhs_greater = lhs_col > rhs
+
+    case1 = sig_lhs & nonsig_rhs_for_sig
+    sig_sig = sig_lhs & ~nonsig_rhs_for_sig
+    case2 = sig_sig & lhs_greater
+    case3 = sig_sig & ~lhs_greater
+    case6 = ~sig_lhs & sig_rhs_for_nonsig
+    nonsig_nonsig = ~sig_lhs & ~sig_rhs_for_nonsig
+    case4 = nonsig_nonsig & lhs_greater
+    case5 = nonsig_nonsig & ~lhs_greater
+
+    # probability of each case per CGC-CGC pair: the fraction of the pool in it
+    p = np.array([case.mean(axis=1) for case in (case1, case2, case3, case4, case5, case6)])
+    medians = [discrete_median(pmf) for pmf in poisson_binomial_pmf(p)]
+    norm = [v/float(n_neighbors) for v in medians]
+
+    sum_RHS = k*rhs.mean()
+    sig_sum_RHS = np.where(sig_sig | case6, rhs, 0.0).mean(axis=1).sum()
+
+    sig_sum_LHS = np.sum([v for v in lhs_values if v > sig_threshold])
+    sum_LHS = np.sum(lhs_values)
+
+    return tuple([k] + medians + [sum_LHS, sig_sum_LHS, sum_RHS, sig_sum_RHS] + norm)
+
+
+def partition_partners(d, neighbor_set, reference_genes):
+    '''
+    Split the partners of a CGC gene in a single pass.
+    d: dictionary for single CGC g containing all its partners,
+    neighbor_set: all neighbors of g,
+    reference_genes: set of known driver genes.
+    Returns the -log p-values of the CGC neighbors, CGC non neighbors and non CGC neighbors.
+    '''
+    cg_nb = []
+    cg_nnb = []
+    ncg_nb = []
+    for k, v in d.items():
+        if k in reference_genes:
+            if k in neighbor_set:
+                cg_nb.append(v)
+            else:
+                cg_nnb.append(v)
+        elif k in neighbor_set:
+            ncg_nb.append(v)
+
+    return cg_nb, cg_nnb, ncg_nb
+
+
+def evaluate_reference_gene(d, neighbor_set, reference_genes, randiter, sig_threshold, streams, common_random_numbers=False, exact=False, bootstrap=0):
+    '''
+    First and second evaluation for a single CGC gene g.
+    d: dictionary for single CGC g containing all its partners,
+    neighbor_set: all neighbors of g,
+    reference_genes: set of known driver genes,
+    randiter: inner iteration,
+    sig_threshold: significance threshold for -log p-values,
+    streams: RandomStreams of g; the controls of both evaluations are drawn from one block of
+    uniforms of its stream 'controls', a row per iteration, so row j does not depend on randiter,
+    common_random_numbers: draw the controls of both evaluations from the same numbers,
+    exact: exact medians and expectations instead of randiter draws (exact_case_counts),
+    bootstrap: number of bootstrap replicates of the medians (bootstrap_medians), 0 for none.
+
+    Returns the 17-tuples of the first evaluation (CGC-CGC pairs vs CGC-non neighbor pairs)
+    and of the second evaluation (CGC-CGC pairs vs CGC-non CGC neighbor pairs), and the bootstrap
+    replicates of both (None without bootstrap, exact or NaN results). An evaluation gives NaNs
+    when g has no CGC neighbor or fewer control pairs than CGC-CGC pairs.
+    '''
+    cg_nb, cg_nnb, ncg_nb = partition_partners(d, neighbor_set, reference_genes)
+    k = len(cg_nb)
+    n_neighbors = len(neighbor_set)
+
+    results = []
+    replicates = [None, None]
+    u = None
+    for e, pool in enumerate((cg_nnb, ncg_nb)):
+        if k == 0 or k > len(pool):
+            results.append(NAN_RESULT)
+            continue
+        if exact:
+            results.append(exact_case_counts(cg_nb, pool, n_neighbors, sig_threshold))
+            continue
+        pool = np.asarray(pool, dtype=float)
+
+        # k uniforms per evaluation, the second evaluation reuses the first k with common random numbers
+        if u is None:
+            u = streams.generator('controls').random((randiter, 2*k))
+        cols = slice(0, k) if e == 0 or common_random_numbers else slice(k, 2*k)
+        idx = uniforms_to_indices(u[:, cols], len(pool))
+        stats = iteration_case_counts(cg_nb, pool[idx.T], sig_threshold)
+        results.append(summarize_iterations(cg_nb, stats, n_neighbors, sig_threshold))
+        if bootstrap:
+            replicates[e] = bootstrap_medians(stats, bootstrap, streams.generator('bootstrap'))
+
+    return tuple(results) + (tuple(replicates) if bootstrap else None,)
+
+
+def evaluate_reference_gene_adaptive(d, neighbor_set, reference_genes, sig_threshold, adaptive, streams, common_random_numbers=False, bootstrap=0):
+    '''
+    evaluate_reference_gene with the number of iterations chosen by adaptive (AdaptiveIterations).
+    Both evaluations draw the same iterations, the batches until the medians of both converged.
+    The batches are the next rows of the block of uniforms of evaluate_reference_gene, so a gene
+    stopped after n iterations has the results of randiter = n.
+    Returns the two 17-tuples, their bootstrap replicates as evaluate_reference_gene and the
+    number of iterations drawn.
+    '''
+    cg_nb, cg_nnb, ncg_nb = partition_partners(d, neighbor_set, reference_genes)
+    k = len(cg_nb)
+    n_neighbors = len(neighbor_set)
+    pools = [np.asarray(pool, dtype=float) for pool in (cg_nnb, ncg_nb)]
+    active = [e for e, pool in enumerate(pools) if 0 < k <= len(pool)]
+
+    stats = {e: [] for e in active}
+    generator = streams.generator('controls')
+    n = 0
+    previous = None
+    while active and n < adaptive.max_iter:
+        b = adaptive.next_batch(n)
+        u = None
+        for e in active:
+            pool = pools[e]
+            if u is None:
+                u = generator.random((b, 2*k))
+            cols = slice(0, k) if e == 0 or common_random_numbers else slice(k, 2*k)
+            idx = uniforms_to_indices(u[:, cols], len(pool))
+            stats[e].append(iteration_case_counts(cg_nb, pool[idx.T], sig_threshold))
+        n += b
+
+        current = np.concatenate([np.median(np.hstack(stats[e]), axis=1) for e in active])
+        if previous is not None and adaptive.converged(previous, current):
+            break
+        previous = current
+
+    stats = {e: np.hstack(batches) for e, batches in stats.items()}
+    results = tuple(summarize_iterations(cg_nb, stats[e], n_neighbors, sig_threshold) if e in stats else NAN_RESULT
+                    for e in range(2))
+    replicates = None
+    if bootstrap:
+        replicates = tuple(bootstrap_medians(stats[e], bootstrap, streams.generator('bootstrap')) if e in stats else None
+                           for e in range(2))
+    return results + (replicates, n)
+
+
+def evaluate_reference_genes(genes, randiter, sig_threshold, rows, dict_neighbors, reference_genes, streams, common_random_numbers=False, exact=False, adaptive=None, bootstrap=0):
+    '''
+    Evaluate a work unit of reference genes with evaluate_reference_gene.
+    rows: dictionary {g: {partner: -log p}},
+    dict_neighbors: dictionary {g: set of neighbors},
+    streams: RandomStreams of the method; every gene draws from its child stream, so the
+    results do not depend on how the genes are split into units,
+    exact: exact medians and expectations, nothing is drawn,
+    adaptive: AdaptiveIterations, the number of iterations is chosen per gene and randiter is not used,
+    bootstrap: number of bootstrap replicates of the medians, 0 for none.
+    Returns a list of (g, first evaluation, second evaluation, iterations drawn, bootstrap replicates)
+    in order of genes.
+    '''
+    results = []
+    for g in genes:
+        gene_streams = streams.child(g)
+        if adaptive is not None and not exact:
+            result_nnb, result_ncgnb, replicates, n = evaluate_reference_gene_adaptive(
+                rows[g], dict_neighbors[g], reference_genes, sig_threshold, adaptive, gene_streams,
+                common_random_numbers=common_random_numbers, bootstrap=bootstrap)
+        else:
+            result_nnb, result_ncgnb, replicates = evaluate_reference_gene(
+                rows[g], dict_neighbors[g], reference_genes, randiter, sig_threshold, gene_streams,
+                common_random_numbers=common_random_numbers, exact=exact, bootstrap=bootstrap)
+            n = 0 if exact else randiter
+        results.append((g, result_nnb, result_ncgnb, n, replicates))
+
+    return results
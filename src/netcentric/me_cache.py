@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+"""
+Binary columnar cache for the pairwise ME result files.
+
+A result file is converted once into a directory next to it:
+    header.json   gene dictionary, method, minimum nonzero p-value and source stamp
+    gene1.npy     int32 gene IDs
+    gene2.npy     int32 gene IDs
+    pvalue.npy    float32 p-values
+    logp.npy      float64 -log p-values with the zero p-value rule of the method
+
+The arrays are memory-mapped on load, so several processes share the pages. The
+cache is rebuilt when the size of the source file changes, or when its modification
+time changes and its content hash differs.
+"""
+
+import hashlib
+import json
+import os
+import warnings
+from array import array
+
+import numpy as np
+
+CACHE_VERSION = 1
+CACHE_SUFFIX = '.npcache'
+COLUMNS = ('gene1', 'gene2', 'pvalue', 'logp')
+
+
+class PairTable(object):
+    '''
+    Columnar view of an ME result file.
+    genes: gene symbols, indexed by gene ID,
+    gene1, gene2: gene IDs of each pair,
+    pvalue: p-value of each pair,
+    logp: -log p-value of each pair, zero p-values replaced as per the method,
+    min_pval: minimum nonzero p-value.
+    '''
+
+    def __init__(self, genes, gene1, gene2, pvalue, logp, min_pval):
+        self.genes = genes
+        self.gene_index = {g: i for i, g in enumerate(genes)}
+        self.gene1 = gene1
+        self.gene2 = gene2
+        self.pvalue = pvalue
+        self.logp = logp
+        self.min_pval = min_pval
+
+    def __len__(self):
+        return len(self.gene1)
+
+    def gene_mask(self, genes):
+        '''boolean array over gene IDs, True for the given genes'''
+        mask = np.zeros(len(self.genes), dtype=bool)
+        ids = [self.gene_index[g] for g in genes if g in self.gene_index]
+        mask[ids] = True
+        return mask
+
+    def row_pairs(self, row_genes, partner_genes=None):
+        '''
+        Owner, partner and pair position of every pair involving row_genes, one entry
+        per (owner, partner) in order of the file, keeping the first occurrence.
+        partner_genes: optionally keep only these partners.
+        '''
+        mask = self.gene_mask(row_genes)
+        pmask = np.ones(len(self.genes), dtype=bool) if partner_genes is None else self.gene_mask(partner_genes)
+        pos1 = np.flatnonzero(mask[self.gene1] & pmask[self.gene2])
+        pos2 = np.flatnonzero(mask[self.gene2] & pmask[self.gene1])
+
+        owner = np.concatenate([self.gene1[pos1], self.gene2[pos2]]).astype(np.int64)
+        partner = np.concatenate([self.gene2[pos1], self.gene1[pos2]]).astype(np.int64)
+        pos = np.concatenate([pos1, pos2])
+        side = np.concatenate([np.zeros(len(pos1), dtype=np.int8), np.ones(len(pos2), dtype=np.int8)])
+
+        order = np.lexsort((side, pos, owner))
+        owner, partner, pos = owner[order], partner[order], pos[order]
+        _, first = np.unique(owner*len(self.genes) + partner, return_index=True)
+        first.sort()
+
+        return owner[first], partner[first], pos[first]
+
+    def rows(self, row_genes, values=None, partner_genes=None):
+        '''
+        Dictionary {g: {partner: value}} for the genes of row_genes in the table.
+        values: per pair values, default is the -log p-values,
+        partner_genes: optionally keep only these partners.
+        '''
+        if values is None:
+            values = self.logp
+        owner, partner, pos = self.row_pairs(row_genes, partner_genes=partner_genes)
+        vals = np.asarray(values[pos])
+
+        rows = {}
+        bounds = np.flatnonzero(np.diff(owner)) + 1
+        for start, end in zip(np.r_[0, bounds], np.r_[bounds, len(owner)]):
+            if start == end:
+                continue
+            g = self.genes[owner[start]]
+            rows[g] = dict(zip([self.genes[i] for i in partner[start:end]], vals[start:end]))
+
+        return rows
+
+
+def cache_path_for(filename):
+    '''directory of the binary cache of a result file'''
+    return filename + CACHE_SUFFIX
+
+
+def file_hash(filename, block_size=1 << 22):
+    '''sha1 of a file'''
+    h = hashlib.sha1()
+    with open(filename, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def source_stamp(filename, with_hash=True):
+    '''size, mtime and (optionally) hash of a source file'''
+    st = os.stat(filename)
+    stamp = {'size': st.st_size, 'mtime': st.st_mtime}
+    if with_hash:
+        stamp['sha1'] = file_hash(filename)
+    return stamp
+
+
+def parse_result_file(filename, m, pvalue_position=3):
+    '''
+    Parse a whitespace delimited ME result file into a PairTable.
+    m: method, zero p-values give 0 for WExT and -log(min_pval) for the others.
+    '''
+    gene_index = {}
+    gene1 = array('i')
+    gene2 = array('i')
+    pvalue = array('d')
+
+    with open(filename, 'r') as f:
+        next(f)
+        for line in f:
+            line = line.split()
+            i = gene_index.setdefault(line[1], len(gene_index))
+            j = gene_index.setdefault(line[2], len(gene_index))
+            gene1.append(i)
+            gene2.append(j)
+            pvalue.append(float(line[pvalue_position]))
+
+    pvals = np.frombuffer(pvalue, dtype=float)
+    nonzero = pvals[pvals != 0]
+    min_pval = float(nonzero.min()) if len(nonzero) else np.nan
+    logp = neg_log_pvalues(pvals, m, min_pval)
+
+    return PairTable(list(gene_index), np.frombuffer(gene1, dtype=np.int32), np.frombuffer(gene2, dtype=np.int32),
+                     pvals.astype(np.float32), logp, min_pval)
+
+
+def neg_log_pvalues(pvals, m, min_pval):
+    '''-log p with the zero p-value rule of the method'''
+    zero_logp = 0.0 if m == 'wext' else -np.log(min_pval)
+    with np.errstate(divide='ignore'):
+        return np.where(pvals == 0, zero_logp, -np.log(pvals))
+
+
+def write_cache(table, filename, m, pvalue_position=3, cache_path=None, stamp=None):
+    '''write a PairTable as the binary cache of filename'''
+    if cache_path is None:
+        cache_path = cache_path_for(filename)
+    if stamp is None:
+        stamp = source_stamp(filename)
+    if not os.path.exists(cache_path):
+        os.makedirs(cache_path)
+    header_file = os.path.join(cache_path, 'header.json')
+    if os.path.exists(header_file):
+        os.remove(header_file)
+
+    # replace the arrays instead of truncating them, they may be mapped by other processes
+    for col in COLUMNS:
+        outfile = os.path.join(cache_path, col + '.npy')
+        with open(outfile + '.tmp', 'wb') as f:
+            np.save(f, getattr(table, col))
+        os.replace(outfile + '.tmp', outfile)
+
+    header = {'version': CACHE_VERSION, 'method': m, 'pvalue_position': pvalue_position,
+              'min_pval': table.min_pval, 'n_pairs': len(table), 'source': stamp, 'genes': table.genes}
+    # header last: a cache without header is never read
+    with open(header_file + '.tmp', 'w') as f:
+        json.dump(header, f)
+    os.replace(header_file + '.tmp', header_file)
+
+
+def read_header(cache_path):
+    '''header of a cache directory, None when there is no complete cache'''
+    header_file = os.path.join(cache_path, 'header.json')
+    if not os.path.exists(header_file):
+        return None
+    with open(header_file, 'r') as f:
+        return json.load(f)
+
+
+def is_valid(header, filename, m, pvalue_position=3):
+    '''check a cache header against the source file'''
+    if header is None or header.get('version') != CACHE_VERSION:
+        return False
+    if header['method'] != m or header['pvalue_position'] != pvalue_position:
+        return False
+
+    source = header['source']
+    stamp = source_stamp(filename, with_hash=False)
+    if stamp['size'] != source['size']:
+        return False
+    if stamp['mtime'] == source['mtime']:
+        return True
+    return file_hash(filename) == source['sha1']
+
+
+def read_cache(cache_path, mmap_mode='r'):
+    '''load a PairTable from its cache directory, arrays are memory-mapped'''
+    header = read_header(cache_path)
+    arrays = [np.load(os.path.join(cache_path, col + '.npy'), mmap_mode=mmap_mode) for col in COLUMNS]
+    return PairTable(header['genes'], *arrays, min_pval=header['min_pval'])
+
+
+def convert_result_file(filename, m, pvalue_position=3, cache_path=None):
+    '''convert a result file into its binary cache, returns the PairTable'''
+    stamp = source_stamp(filename)
+    table = parse_result_file(filename, m, pvalue_position=pvalue_position)
+    write_cache(table, filename, m, pvalue_position=pvalue_position, cache_path=cache_path, stamp=stamp)
+    return table
+
+
+def load_pair_table(filename, m, pvalue_position=3, use_cache=True, cache_path=None):
+    '''
+    PairTable of an ME result file, read from the binary cache when it is up to date.
+    Otherwise the file is parsed and the cache is (re)written; when the cache can not be
+    written the parsed table is returned with a warning.
+    '''
+    if not use_cache:
+        return parse_result_file(filename, m, pvalue_position=pvalue_position)
+
+    if cache_path is None:
+        cache_path = cache_path_for(filename)
+    if is_valid(read_header(cache_path), filename, m, pvalue_position=pvalue_position):
+        return read_cache(cache_path)
+
+    stamp = source_stamp(filename)
+    table = parse_result_file(filename, m, pvalue_position=pvalue_position)
+    try:
+        write_cache(table, filename, m, pvalue_position=pvalue_position, cache_path=cache_path, stamp=stamp)
+    except OSError as e:
+        warnings.warn('could not write ME result cache {}: {}'.format(cache_path, e))
+
+    return table
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+"""
+Paths of the pairwise mutual exclusivity (ME) result files, read by netcentric.me_cache.
+"""
+
+
+def result_file_paths(methods, c, t, data_dir='../data/'):
+    '''set input paths as per the location of the MEX results
+    m:methods, c: cancer type, t: threshold'''
+    dict_infile = {}
+    dict_infile_intact = {}
+    for m in methods:
+        if m == 'discover':
+            suffix = '{}_mutation_filtered_ep_data/{}_{}_result_mutations_all_genes_q1.0_normal_{}.txt'.format(m,c,m,t)
+            suffix_intact = '{}_mutation_filtered_ep_data/{}_pairs_q1.0_normal_intact_filtered_subset{}.txt'.format(m,c,t)
+        elif m == 'discover_strat':
+            suffix = '{}_mutation_filtered_ep_data/{}_{}_result_mutations_all_genes_q1.0_stratified_{}.txt'.format('discover',c,'discover',t)
+            suffix_intact = '{}_mutation_filtered_ep_data/{}_pairs_q1.0_stratified_intact_filtered_subset{}.txt'.format('discover',c,t)
+        else:
+            suffix = '{}_mutation_filtered_ep_data/{}_{}_result_mutations_all_genes_{}.txt'.format(m,c,m,t)
+            suffix_intact = '{}_mutation_filtered_ep_data/{}_{}_pairs_intact_filtered_subset{}.txt'.format(m,c,m,t)
+
+        dict_infile[m] = data_dir + suffix
+        dict_infile_intact[m] = data_dir + suffix_intact
+
+    return dict_infile, dict_infile_intact
+
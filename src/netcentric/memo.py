@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+MEMO permutation test of mutual exclusivity on the patient x gene bipartite graph.
+
+The coverage of a gene pair is the number of patients with either gene mutated,
+|A|+|B|-|A∩B|, and its p-value the fraction of random graphs of the same gene and
+patient degrees whose coverage is at least the observed one. Every random graph is
+the observed graph after swaps_per_edge swap attempts per mutation: a random gene
+pair, a random patient of each, and the patients are swapped when neither has the
+other gene mutated.
+
+The swaps run on compact arrays, for several chains (random graphs) at once: the
+patients of every gene are a slice of one slot array, as in a CSR matrix, next to
+the boolean patient x gene matrix. A batch pairs the genes of every chain by a random
+permutation and makes one attempt per pair; the pairs are disjoint, so the attempts of
+a batch can be applied at once. The attempts of a batch are not independent uniform
+pairs as those of the swaps one at a time are, but the chains sample the same null in
+practice: their p-values were checked against the algorithm of the MEMO notebook. A
+chain starts a new random graph by copying the observed arrays back.
+
+The gene degrees stay fixed, so a coverage is at least the observed one exactly when
+the co-occurrence |A∩B| is at most the observed one, and the co-occurrences of all
+pairs of a random graph are one matrix product.
+"""
+
+import numpy as np
+import pandas as pd
+
+from netcentric.parallel import run_tasks
+from netcentric.streams import RandomStreams
+
+SWAPS_PER_EDGE = 100
+CHUNK = 100
+MAX_CHAIN_CELLS = 1 << 28
+
+
+def cooccurrence(matrix, rows=None):
+    '''(rows, genes) co-occurrences of a patients x genes 0/1 matrix, all genes as rows by default'''
+    x = np.asarray(matrix, dtype=np.float32)
+    left = x if rows is None else x[:, rows]
+    return np.rint(left.T.dot(x)).astype(np.int64)
+
+
+def coverage(matrix, rows=None):
+    '''(rows, genes) coverages |A|+|B|-|A∩B| of a patients x genes 0/1 matrix'''
+    counts = np.asarray(matrix, dtype=np.int64).sum(axis=0)
+    left = counts if rows is None else counts[rows]
+    return left[:, None] + counts[None, :] - cooccurrence(matrix, rows)
+
+
+class SwapChains(object):
+    '''
+    Degree preserving edge swaps of chains random graphs of a patients x genes 0/1 matrix.
+    member: (chains, patients, genes) boolean matrices,
+    indptr, slots: the patients of gene g in chain r are slots[r, indptr[g]:indptr[g+1]].
+    '''
+
+    def __init__(self, matrix, chains=1):
+        matrix = np.asarray(matrix) != 0
+        self.n_patients, self.n_genes = matrix.shape
+        self.degrees = matrix.sum(axis=0)
+        self.indptr = np.concatenate([[0], np.cumsum(self.degrees)]).astype(np.int64)
+        # gene major patients of the mutations, the slots of gene g from indptr[g]
+        _, patients = np.nonzero(matrix.T)
+        self.observed = (matrix, patients.astype(np.int32))
+        self.member = np.empty((chains,) + matrix.shape, dtype=bool)
+        self.slots = np.empty((chains, len(patients)), dtype=np.int32)
+        self.reset()
+
+    @property
+    def chains(self):
+        return len(self.member)
+
+    @property
+    def n_edges(self):
+        return self.slots.shape[1]
+
+    def reset(self):
+        '''all chains back to the observed graph'''
+        self.member[:] = self.observed[0]
+        self.slots[:] = self.observed[1]
+
+    def swap(self, attempts, generator):
+        '''attempts swap attempts in every chain, in batches of one per pair of genes. Returns the swaps done per chain.'''
+        n_genes = self.n_genes
+        if n_genes < 2 or self.n_edges == 0:
+            return np.zeros(self.chains, dtype=np.int64)
+        batch = n_genes//2
+        # flat positions of the cells and slots of every chain
+        member, slots = self.member.reshape(-1), self.slots.reshape(-1)
+        cells = (np.arange(self.chains, dtype=np.int64)*self.n_patients*n_genes)[:, None]
+        edges = (np.arange(self.chains, dtype=np.int64)*self.n_edges)[:, None]
+        swapped = np.zeros(self.chains, dtype=np.int64)
+
+        for start in range(0, attempts, batch):
+            genes = np.argsort(generator.random((self.chains, n_genes)), axis=1)[:, :2*min(batch, attempts - start)]
+            g1, g2 = genes[:, 0::2], genes[:, 1::2]
+            d1, d2 = self.degrees[g1], self.degrees[g2]
+
+            s1 = edges + np.minimum(self.indptr[g1] + (generator.random(g1.shape)*d1).astype(np.int64), self.n_edges - 1)
+            s2 = edges + np.minimum(self.indptr[g2] + (generator.random(g2.shape)*d2).astype(np.int64), self.n_edges - 1)
+            p1, p2 = slots[s1].astype(np.int64)*n_genes + cells, slots[s2].astype(np.int64)*n_genes + cells
+            ok = (d1 > 0) & (d2 > 0) & ~member[p1 + g2] & ~member[p2 + g1]
+
+            member[(p1 + g1)[ok]] = False
+            member[(p2 + g2)[ok]] = False
+            member[(p1 + g2)[ok]] = True
+            member[(p2 + g1)[ok]] = True
+            slots[s1[ok]], slots[s2[ok]] = slots[s2[ok]], slots[s1[ok]]
+            swapped += ok.sum(axis=1)
+        return swapped
+
+
+def default_chains(n_patients, n_genes):
+    '''chains whose matrices take at most MAX_CHAIN_CELLS cells together, 1 to 64'''
+    return int(min(64, max(1, MAX_CHAIN_CELLS // max(1, n_patients*n_genes))))
+
+
+def permutation_counts(chunk, iterations, matrix, rows=None, swaps_per_edge=SWAPS_PER_EDGE, chains=None, streams=None):
+    '''
+    (rows, genes) number of the random graphs of chunk with a co-occurrence at most the
+    observed one, iterations random graphs drawn from the stream of ('memo', chunk).
+    '''
+    streams = streams or RandomStreams()
+    generator = streams.generator('memo', chunk)
+    matrix = np.asarray(matrix) != 0
+    observed = cooccurrence(matrix, rows)
+    # rounds of equal numbers of chains, the last round draws no graphs in vain
+    rounds = -(-iterations // (chains or default_chains(*matrix.shape)))
+    engine = SwapChains(matrix, -(-iterations // rounds))
+    attempts = swaps_per_edge*engine.n_edges
+
+    counts = np.zeros(observed.shape, dtype=np.int64)
+    left = iterations
+    while left > 0:
+        engine.reset()
+        engine.swap(attempts, generator)
+        for member in engine.member[:min(left, engine.chains)]:
+            counts += cooccurrence(member, rows) <= observed
+        left -= engine.chains
+    return counts
+
+
+def memo_pvalues(matrix, iterations=10000, rows=None, swaps_per_edge=SWAPS_PER_EDGE, chains=None, workers=1, streams=None, chunk=CHUNK):
+    '''
+    (rows, genes) MEMO p-values of the gene pairs of a patients x genes 0/1 matrix, the
+    pairs of the gene indices rows with every gene, all genes by default.
+    The random graphs are drawn in chunks of chunk graphs, each from its own stream,
+    in workers processes; the p-values do not depend on workers.
+    '''
+    if iterations < 1:
+        raise ValueError('iterations must be at least 1, got {}'.format(iterations))
+    tasks = [((i, min(chunk, iterations - start)), {}) for i, start in enumerate(range(0, iterations, chunk))]
+    shared = dict(matrix=np.asarray(matrix), rows=rows, swaps_per_edge=swaps_per_edge, chains=chains, streams=streams)
+    counts = sum(run_tasks(permutation_counts, tasks, workers=workers, shared=shared))
+    return counts/float(iterations)
+
+
+def _pair_pvalues(pvalues, n_genes, rows=None):
+    '''gene indices i < j and p-values of the pairs with a gene of rows, in order of itertools.combinations'''
+    rowpos = np.arange(n_genes) if rows is None else np.full(n_genes, -1, dtype=np.int64)
+    if rows is not None:
+        rowpos[rows] = np.arange(len(rows))
+    i, j = np.triu_indices(n_genes, 1)
+    keep = (rowpos[i] >= 0) | (rowpos[j] >= 0)
+    i, j = i[keep], j[keep]
+    return i, j, np.where(rowpos[i] >= 0, pvalues[rowpos[i], j], pvalues[rowpos[j], i])
+
+
+def memo_table(genes, pvalues, rows=None):
+    '''gene1, gene2, pvalue table of the gene pairs of memo_pvalues'''
+    genes = np.asarray(genes, dtype=object)
+    i, j, p = _pair_pvalues(pvalues, len(genes), rows)
+    return pd.DataFrame({'gene1': genes[i], 'gene2': genes[j], 'pvalue': p}, columns=['gene1', 'gene2', 'pvalue'])
+
+
+def intact_table(genes, pvalues, edges, rows=None):
+    '''gene1, gene2, pvalue table of the network edges (g1, g2) among the gene pairs of memo_pvalues'''
+    index = {g: i for i, g in enumerate(genes)}
+    rowpos = np.arange(len(genes)) if rows is None else np.full(len(genes), -1, dtype=np.int64)
+    if rows is not None:
+        rowpos[rows] = np.arange(len(rows))
+    out = []
+    for g1, g2 in edges:
+        i, j = index.get(g1), index.get(g2)
+        if i is None or j is None or i == j:
+            continue
+        if rowpos[i] >= 0:
+            out.append([g1, g2, pvalues[rowpos[i], j]])
+        elif rowpos[j] >= 0:
+            out.append([g1, g2, pvalues[rowpos[j], i]])
+    return pd.DataFrame(out, columns=['gene1', 'gene2', 'pvalue'])
@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+"""
+ME Evaluations Based on Corrections via MLA: percentage of significant CGC-CGC pairs
+per gene against its mutation load association (MLA), for all CGC partners, randomly
+sampled partners and PPI neighbors. Used by evaluations_via_mla.py and
+evaluations_via_mla_neighbors.py.
+
+matplotlib is imported by the plotting functions only.
+"""
+
+import string
+
+import numpy as np
+from scipy.stats import pearsonr
+from tqdm.auto import tqdm
+
+from netcentric.datasets import METHOD_NAMES
+from netcentric.streams import RandomStreams
+
+
+def cgcg_pairs(table, ref_genes):
+    '''
+    mutual exclusivity p-values of the CGC-CGC pairs of a result table,
+    ref_genes: reference driver genes (COSMIC)
+    '''
+    return table.rows(ref_genes, values=table.pvalue, partner_genes=ref_genes)
+
+
+def get_sig_dict(d,m):
+    '''get percentage significance from a dictionary of CGC-CGC neighbors
+    '''
+    d_out={}
+    for g in d:
+        count=0
+        for k,v in d[g].items():
+            if m=='wext' and v==0:
+                continue
+            elif v<0.05:
+                count+=1
+        d_out[g]= float(count)/float(len(d[g]))
+    return d_out
+
+def get_sig_dict_from_random_sampling(d,d_nb,method,streams=None):
+    '''get percentage significance through random sampling
+    streams: RandomStreams, each (method, gene, iteration) samples from its own stream
+    '''
+    if streams is None:
+        streams = RandomStreams()
+    common_genes = set.intersection(set(d), set(d_nb))
+    dict_sig = {}
+    for g in common_genes:
+        l_temp=[]
+        for i in range(100):
+            k_temp = {k:d[g][k] for k in streams.sample(d[g],len(d_nb[g]),method,g,i)}
+
+            count=0
+            for k,v in k_temp.items():
+                if method=='wext' and v==0:
+                    continue
+                elif v<0.05:
+                    count+=1
+
+            l_temp.append(float(count)/len(k_temp))
+
+        dict_sig[g] = np.mean(l_temp)
+
+    return dict_sig
+
+def get_mla_limits(d_y,d_x):
+    ''' get max and min MLA for same x axis
+        d_y: sig values
+        d_x: MLA values
+    '''
+    l = []
+    for k,v in d_y.items():
+        if k in d_x:
+            l.append(d_x[k])
+
+    return max(l), min(l)
+
+def get_neighbors_exc(methods,d):
+    '''
+    Get neighbors excluding ones with only one neighbor.
+    Parameters
+    ----------
+    methods : specific method eg. discover, fishers..
+    d : dictionary containing all neighbors .
+    d_out2 : dictionary containing genes that has multiple neighbors.
+    '''
+    d_out2={}
+    for m2, genes_dict in d.items():
+        d_out={}
+        for g1 in genes_dict:
+          count=0
+          for k in genes_dict[g1]:
+            v=genes_dict[g1][k]
+            count+=1
+          if count!=1:
+            d_out[g1]={}
+            for k in genes_dict[g1]:
+              v=genes_dict[g1][k]
+              d_out[g1][k]=v
+        d_out2[m2]=d_out
+    return d_out2
+
+def perc_sig_cgcg(d1,d2):
+    '''
+    filter cgc-cgc pair dictionary which has more than one neighbors.
+    '''
+    d_out={}
+    for m, genes2 in d1.items():
+      for genes, val in d2.items():
+        for g1 in genes2:
+          if g1==genes:
+            d_out[g1]=val
+    return d_out
+
+
+def get_number_of_neighbors(d,m):
+    '''
+    get number of neighbors.
+    d: dictionary input
+    m: method
+    '''
+    d_out={}
+    for g in d:
+        count=0
+        for k,v in d[g].items():
+            count+=1
+        d_out[g]=count
+    return d_out
+
+
+def percent_significance(methods, dict_cg_cg, dict_cg_cg_nb, streams=None, multiple_neighbors=False):
+    '''
+    Percentage significance per gene of every method.
+    dict_cg_cg: {method: CGC-CGC p-values}, all pairs,
+    dict_cg_cg_nb: {method: CGC-CGC p-values}, PPI neighbor pairs,
+    streams: RandomStreams of the random sampling,
+    multiple_neighbors: only genes with more than one neighbor.
+
+    Returns {method: {'sig', 'rand', 'nb'[, 'sig_discover', 'rand_discover']: {gene: fraction}}},
+    the discover entries for discover_strat only.
+    '''
+    if multiple_neighbors:
+        dict_cg_cg_nb = get_neighbors_exc(methods, dict_cg_cg_nb)
+
+    out = {}
+    for m in tqdm(methods):
+        d = {'sig': get_sig_dict(dict_cg_cg[m], m),
+             'rand': get_sig_dict_from_random_sampling(dict_cg_cg[m],dict_cg_cg_nb[m],m,streams=streams),
+             'nb': get_sig_dict(dict_cg_cg_nb[m], m)}
+        if m=='discover_strat':
+            d['sig_discover'] = get_sig_dict(dict_cg_cg['discover'],'discover')
+            d['rand_discover'] = get_sig_dict_from_random_sampling(dict_cg_cg['discover'],dict_cg_cg_nb['discover'],'discover',streams=streams)
+        if multiple_neighbors:
+            d['sig'] = perc_sig_cgcg(dict_cg_cg_nb,d['sig'])
+            if m=='discover_strat':
+                d['sig_discover'] = perc_sig_cgcg(dict_cg_cg_nb,d['sig_discover'])
+        out[m] = d
+    return out
+
+
+def plot_from_dict(d, d_mla,ax, mla_limits, annotation_threshold_y=-0.0,annotation_threhsold_x=1.5,title='',color='k'):
+    '''scatter of percentage significance against MLA, mla_limits: (max, min) MLA of the x axis'''
+    max_mla, min_mla = mla_limits
+    l_mla_all = []
+    l_sig_all = []
+
+    for k,v in d.items():
+        if k in d_mla:
+            l_mla_all.append(d_mla[k])
+            l_sig_all.append(v)
+
+
+    ax.scatter(l_mla_all,l_sig_all, c=color,alpha=0.3)
+
+    r,p = pearsonr(l_mla_all,l_sig_all)
+    print('r:{}\nP:{}'.format(r,p))
+    ax.text(0.85, 0.97, 'r = {}\nP = {:.3g}'.format(round(r,2), p), ha='left', va='top', fontsize=8,transform=ax.transAxes)
+
+    for k,v in d.items():
+        if v>annotation_threshold_y and d_mla[k]<annotation_threhsold_x:
+            ax.annotate(k, (d_mla[k],v), ha='left',va='top',xytext=(d_mla[k]+0.08,v-0.01))
+
+    ax.set_xlim(min_mla-0.5,max_mla+0.5)
+    ax.set_ylim(-0.05,1.05)
+    labels = [str(int(round(float(item)*100))) for item in ax.get_yticks()]
+    print(labels)
+
+    ax.set_yticklabels(labels)
+    ax.set_xlabel('Mutation Load Association (MLA)')
+    ax.set_ylabel('Percentage of Significant Findings (P<0.05)')
+    ax.set_title(title)
+
+def plot_from_dict_arrow(d,d_nb, d_mla,ax, mla_limits, annotation_threshold_y=-0.0,annotation_threhsold_x=1.5,title='',c1='C3',c2='K'):
+    '''plot with direction of arrow going from dict d to dict d_nb
+    annotation thresholds define the points until which gene annotation
+    is done in the graph, mla_limits: (max, min) MLA of the x axis
+    '''
+    max_mla, min_mla = mla_limits
+    l_mla_all = []
+    l_sig_all = []
+    l_sig_nb = []
+    for k,v in d.items():
+        if k in d_mla and k in d_nb:
+            l_mla_all.append(d_mla[k])
+            l_sig_all.append(v)
+            l_sig_nb.append(d_nb[k])
+    ax.scatter(l_mla_all,l_sig_nb, c=c1,alpha=0.7)
+    ax.scatter(l_mla_all,l_sig_all, c=c2,alpha=0.2)
+
+    r,p = pearsonr(l_mla_all,l_sig_nb)
+    print('r:{}\nP:{}'.format(r,p))
+    ax.text(0.85, 0.97, 'r = {}\nP = {:.3g}'.format(round(r,2), p), ha='left', va='top', fontsize=8,transform=ax.transAxes)
+
+    for k,v in d_nb.items():
+        if v>annotation_threshold_y and d_mla[k]<annotation_threhsold_x:
+            ax.annotate(k, (d_mla[k],v), ha='left',va='top',xytext=(d_mla[k]+0.08,v-0.01))
+
+    for _mla,_all,_nb in zip(l_mla_all, l_sig_all,l_sig_nb):
+        if _mla<annotation_threhsold_x and abs(_all-_nb)>0.01:
+            if _all<_nb:
+                ax.annotate("", xytext=(_mla, _all), xy=(_mla, _all+_nb-_all), arrowprops=dict(arrowstyle="->", alpha=0.2))
+            else:
+                ax.annotate("", xytext=(_mla, _all), xy=(_mla, _all+_nb-_all), arrowprops=dict(arrowstyle="->", alpha=0.2))
+
+    ax.set_xlim(min_mla-0.5,max_mla+0.5)
+    ax.set_ylim(-0.05,1.05)
+    labels = [str(int(round(float(item)*100))) for item in ax.get_yticks()]
+
+    ax.set_yticklabels(labels)
+    ax.set_xlabel('Mutation Load Association (MLA)')
+    ax.set_ylabel('Percentage of Significant Findings (P<0.05)')
+    ax.set_title(title)
+
+
+def plot_percent_significance(methods, sig, MLA, val_x=2.0, val_y=0.5, figsize=(25,40), scatter_color='k'):
+    '''
+    Figure of three panels per method: CGC-CGC pairs, randomly sampled CGC-CGC pairs
+    and CGC-CGC neighbors. sig: return value of percent_significance.
+    '''
+    import matplotlib.pyplot as plt
+
+    fig, axes = plt.subplots(len(methods),3,figsize=figsize)
+    letters = list(string.ascii_uppercase)[:len(methods)*3]
+    axiter=axes.flat
+    for i,m in tqdm(enumerate(methods)):
+        d = sig[m]
+        mla_limits = get_mla_limits(d['sig'],MLA)
+        panels = [(3*i, '{} CGC-CGC pairs'.format(METHOD_NAMES[m])),
+                  (3*i+1, '{} CGC-CGC pairs (random)'.format(METHOD_NAMES[m])),
+                  (3*i+2, '{} CGC-CGC neighbors'.format(METHOD_NAMES[m]))]
+
+        if m=='discover_strat':
+            plot_from_dict_arrow(d['sig_discover'],d['sig'],MLA,axiter[panels[0][0]],mla_limits,title=panels[0][1],c1='C0', annotation_threhsold_x=val_x, annotation_threshold_y=val_y)
+            plot_from_dict_arrow(d['rand_discover'],d['rand'],MLA,axiter[panels[1][0]],mla_limits,title=panels[1][1],c1='C0', annotation_threhsold_x=val_x, annotation_threshold_y=val_y)
+            plot_from_dict_arrow(d['rand'],d['nb'],MLA,axiter[panels[2][0]],mla_limits,title=panels[2][1],c2='C0', annotation_threhsold_x=val_x, annotation_threshold_y=val_y)
+        else:
+            plot_from_dict(d['sig'],MLA,axiter[panels[0][0]],mla_limits,title=panels[0][1],annotation_threhsold_x=val_x,annotation_threshold_y=val_y,color=scatter_color)
+            plot_from_dict(d['rand'],MLA,axiter[panels[1][0]],mla_limits,title=panels[1][1],annotation_threhsold_x=val_x,annotation_threshold_y=val_y,color=scatter_color)
+            plot_from_dict_arrow(d['rand'],d['nb'],MLA,axiter[panels[2][0]],mla_limits,title=panels[2][1], annotation_threhsold_x=val_x, annotation_threshold_y=val_y)
+
+        for k, _ in panels:
+            axiter[k].text(-0.06, 1.1, letters[k], transform=axiter[k].transAxes,
+                  fontsize=16, fontweight='bold', va='top', ha='right')
+
+    plt.rcParams['pdf.fonttype'] = 42
+    plt.rcParams['font.family'] = 'Calibri'
+    return fig
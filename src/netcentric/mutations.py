@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+"""
+Binary mutation matrices as bit-packed gene x patient rows.
+
+A matrix file ({c}_TML_binary_sm.txt) is tab separated: a header of gene symbols, one
+line per patient with its ID and a 0/1 value per gene, and the label column y, which
+is dropped. Nonzero values are mutations. The file is parsed line by line, in blocks
+of patients, into one row of bits per gene (np.packbits, 8 patients a byte) and the
+number of mutated patients per gene, so a matrix takes an eighth of a byte per entry
+instead of the 8 bytes of a dense int64 DataFrame.
+
+Parsed matrices are cached next to the file as a directory of arrays and a JSON
+header, as the networks (netcentric.network) are; the arrays are memory-mapped.
+"""
+
+import json
+import os
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from netcentric.me_cache import file_hash, read_header, source_stamp
+
+CACHE_VERSION = 1
+CACHE_SUFFIX = '.bits.npcache'
+ARRAYS = ('bits', 'counts')
+LABEL = 'y'
+BLOCK = 1024  # patients parsed before packing, a multiple of 8
+
+
+class MutationMatrix(object):
+    '''
+    Binary mutation matrix, one row of bits per gene.
+    genes: gene symbols, indexed by gene ID, in order of the file,
+    patients: patient IDs, in order of the file,
+    bits: (genes, ceil(patients/8)) uint8 array, bit j of row i set when patient j has gene i mutated,
+    counts: number of mutated patients per gene.
+    '''
+
+    def __init__(self, genes, patients, bits, counts):
+        self.genes = list(genes)
+        self.patients = list(patients)
+        self.gene_index = {g: i for i, g in enumerate(self.genes)}
+        self.bits = bits
+        self.counts = counts
+
+    def __len__(self):
+        return len(self.genes)
+
+    @property
+    def n_patients(self):
+        return len(self.patients)
+
+    def ids(self, genes=None):
+        '''gene IDs of genes, all genes by default'''
+        if genes is None:
+            return np.arange(len(self.genes))
+        return np.array([self.gene_index[g] for g in genes], dtype=np.int64)
+
+    def genes_above(self, t):
+        '''genes mutated in more than t patients, in order of the file'''
+        return [self.genes[i] for i in np.flatnonzero(np.asarray(self.counts) > t)]
+
+    def dense(self, genes=None):
+        '''patients x genes uint8 0/1 array of genes, all genes by default'''
+        return np.unpackbits(self.bits[self.ids(genes)], axis=1, count=self.n_patients).T
+
+    def patient_ids(self, gene):
+        '''indices of the patients with gene mutated'''
+        return np.flatnonzero(np.unpackbits(self.bits[self.gene_index[gene]], count=self.n_patients))
+
+    def patients_of(self, gene):
+        '''frozenset of the IDs of the patients with gene mutated'''
+        return frozenset(self.patients[j] for j in self.patient_ids(gene))
+
+    def cooccurrence(self, genes=None):
+        '''
+        (genes, genes) int64 array of the number of patients with both genes mutated, all genes by
+        default; the diagonal is the counts. One product of the unpacked rows.
+        '''
+        rows = np.unpackbits(self.bits[self.ids(genes)], axis=1, count=self.n_patients).astype(np.float64)
+        return np.rint(rows.dot(rows.T)).astype(np.int64)
+
+    def to_frame(self, genes=None):
+        '''patients x genes DataFrame of genes as read by pd.read_csv without the label column'''
+        genes = self.genes if genes is None else list(genes)
+        return pd.DataFrame(self.dense(genes).astype(np.int64), index=self.patients, columns=genes)
+
+
+def _pack(block, n_genes):
+    '''bytes of a block of patient rows, (genes, rows/8) with the rows padded to a multiple of 8'''
+    rows = np.zeros((len(block) + (-len(block)) % 8, n_genes), dtype=bool)
+    rows[:len(block)] = block
+    return np.packbits(rows, axis=0).T
+
+
+def parse_mutation_matrix(matrix_file, label=LABEL):
+    '''
+    MutationMatrix of a matrix file, read BLOCK patients at a time.
+    label: column dropped from the genes.
+    '''
+    with open(matrix_file, 'r') as f:
+        header = [field.strip() for field in f.readline().rstrip('\r\n').split('\t')][1:]
+        keep = np.array([i for i, g in enumerate(header) if g != label], dtype=np.int64)
+        genes = [header[i] for i in keep]
+
+        patients, packed, block = [], [], []
+        counts = np.zeros(len(genes), dtype=np.int64)
+        for line in f:
+            patient, _, values = line.partition('\t')
+            if not patient.strip():
+                continue
+            values = np.fromstring(values, dtype=float, sep='\t')
+            if len(values) != len(header):
+                raise ValueError('{}: {} values for patient {}, {} columns'.format(matrix_file, len(values), patient, len(header)))
+            patients.append(patient.strip())
+            row = values[keep] != 0
+            counts += row
+            block.append(row)
+            if len(block) == BLOCK:
+                packed.append(_pack(block, len(genes)))
+                block = []
+        if block:
+            packed.append(_pack(block, len(genes)))
+
+    # blocks of BLOCK patients fill whole bytes, only the last block is padded
+    bits = np.ascontiguousarray(np.concatenate(packed, axis=1) if packed else np.zeros((len(genes), 0), dtype=np.uint8))
+    return MutationMatrix(genes, patients, bits, counts)
+
+
+def cache_path_for(matrix_file):
+    '''directory of the bit cache of a matrix file'''
+    return matrix_file + CACHE_SUFFIX
+
+
+def _is_valid(header, source, label):
+    if header is None or header.get('version') != CACHE_VERSION or header.get('label') != label:
+        return False
+    stamp = header['source']
+    current = source_stamp(source, with_hash=False)
+    if current['size'] != stamp['size']:
+        return False
+    return current['mtime'] == stamp['mtime'] or file_hash(source) == stamp['sha1']
+
+
+def write_cache(matrix, cache_path, source, label=LABEL):
+    '''write a MutationMatrix as a directory of arrays and a JSON header'''
+    if not os.path.exists(cache_path):
+        os.makedirs(cache_path)
+    header_file = os.path.join(cache_path, 'header.json')
+    if os.path.exists(header_file):
+        os.remove(header_file)
+
+    for name in ARRAYS:
+        outfile = os.path.join(cache_path, name + '.npy')
+        with open(outfile + '.tmp', 'wb') as f:
+            np.save(f, getattr(matrix, name))
+        os.replace(outfile + '.tmp', outfile)
+
+    header = {'version': CACHE_VERSION, 'label': label, 'genes': matrix.genes, 'patients': matrix.patients,
+              'source': source_stamp(source)}
+    with open(header_file + '.tmp', 'w') as f:
+        json.dump(header, f)
+    os.replace(header_file + '.tmp', header_file)
+
+
+def read_cache(cache_path, mmap_mode='r'):
+    '''load a MutationMatrix from its cache directory'''
+    header = read_header(cache_path)
+    arrays = [np.load(os.path.join(cache_path, name + '.npy'), mmap_mode=mmap_mode) for name in ARRAYS]
+    return MutationMatrix(header['genes'], header['patients'], *arrays)
+
+
+def load_mutation_matrix(matrix_file, label=LABEL, use_cache=True):
+    '''MutationMatrix of a matrix file, read from its bit cache when the file did not change'''
+    if not use_cache:
+        return parse_mutation_matrix(matrix_file, label=label)
+
+    source = os.path.abspath(matrix_file)
+    cache_path = cache_path_for(matrix_file)
+    if _is_valid(read_header(cache_path), source, label):
+        return read_cache(cache_path)
+
+    matrix = parse_mutation_matrix(matrix_file, label=label)
+    try:
+        write_cache(matrix, cache_path, source, label=label)
+    except OSError as e:
+        warnings.warn('could not write mutation matrix cache {}: {}'.format(cache_path, e))
+
+    return matrix
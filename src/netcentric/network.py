@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+"""
+Interaction networks as CSR adjacency over interned gene IDs.
+
+Supported edge files:
+    index + edge ID files     intact_nodupl_{index,edge}_file.txt, hint_{index,edge}_file.txt
+                              (the HINT files are space separated)
+    symbol pairs              intact_edge_file_0.25/0.45.txt, TSN fraction files
+An optional third edge column is kept as the edge confidence (1.0 when missing).
+Gene symbols are upper-cased. Parsed networks are cached next to the edge file.
+"""
+
+import json
+import os
+import warnings
+
+import numpy as np
+
+from netcentric.me_cache import file_hash, read_header, source_stamp
+
+CACHE_VERSION = 1
+CACHE_SUFFIX = '.csr.npcache'
+ARRAYS = ('indptr', 'indices', 'weights')
+
+
+class Network(object):
+    '''
+    Undirected network in CSR form.
+    genes: gene symbols, indexed by gene ID,
+    indptr, indices: the neighbors of gene i are indices[indptr[i]:indptr[i+1]],
+    weights: edge confidence aligned with indices.
+    '''
+
+    def __init__(self, genes, indptr, indices, weights):
+        self.genes = genes
+        self.gene_index = {g: i for i, g in enumerate(genes)}
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+
+    def __len__(self):
+        return len(self.genes)
+
+    def __contains__(self, g):
+        return g in self.gene_index
+
+    @property
+    def n_edges(self):
+        '''number of undirected edges, self loops counted once'''
+        loops = int(np.sum(self.indices == np.repeat(np.arange(len(self.genes)), np.diff(self.indptr))))
+        return (len(self.indices) + loops)//2
+
+    def neighbor_ids(self, g):
+        '''IDs of the neighbors of g (a view on the adjacency)'''
+        i = self.gene_index.get(g)
+        if i is None:
+            return self.indices[:0]
+        return self.indices[self.indptr[i]:self.indptr[i+1]]
+
+    def neighbor_weights(self, g):
+        '''confidences of the edges of g, aligned with neighbor_ids'''
+        i = self.gene_index.get(g)
+        if i is None:
+            return self.weights[:0]
+        return self.weights[self.indptr[i]:self.indptr[i+1]]
+
+    def neighbors(self, g):
+        '''gene symbols of the neighbors of g'''
+        return [self.genes[j] for j in self.neighbor_ids(g)]
+
+    def degree(self, g):
+        i = self.gene_index.get(g)
+        if i is None:
+            return 0
+        return int(self.indptr[i+1] - self.indptr[i])
+
+    def gene_mask(self, genes):
+        '''boolean array over gene IDs, True for the given genes'''
+        mask = np.zeros(len(self.genes), dtype=bool)
+        ids = [self.gene_index[g] for g in genes if g in self.gene_index]
+        mask[ids] = True
+        return mask
+
+    def edges(self):
+        '''list of undirected edges (g1, g2) as gene symbols'''
+        rows = np.repeat(np.arange(len(self.genes)), np.diff(self.indptr))
+        keep = rows <= self.indices
+        return [(self.genes[i], self.genes[j]) for i, j in zip(rows[keep], self.indices[keep])]
+
+    def neighbor_sets(self, genes=None):
+        '''
+        Dictionary of neighbors of genes. For each gene in the dict, all its neighbors
+        among genes are present in the set; genes without such neighbors are left out.
+        '''
+        mask = np.ones(len(self.genes), dtype=bool) if genes is None else self.gene_mask(genes)
+        dict_neighbors = {}
+        for i in np.flatnonzero(mask):
+            nb = self.indices[self.indptr[i]:self.indptr[i+1]]
+            nb = nb[mask[nb]]
+            if len(nb):
+                dict_neighbors[self.genes[i]] = set(self.genes[j] for j in nb)
+        return dict_neighbors
+
+
+def threshold_neighbor_sets(network, genes, thresholds):
+    '''
+    Neighbor sets of genes (as Network.neighbor_sets) in the networks of the edges of
+    network with confidence >= threshold, for the thresholds in increasing order.
+    The edges among genes are sorted by confidence once, and every threshold removes the
+    edges below it from the neighbor sets of the previous threshold.
+    Yields (threshold, neighbor sets, genes whose neighbor sets changed); the neighbor sets
+    are one dictionary updated in place, the first threshold marks all its genes as changed.
+    '''
+    mask = network.gene_mask(genes)
+    rows = np.repeat(np.arange(len(network.genes)), np.diff(network.indptr))
+    keep = (rows <= network.indices) & mask[rows] & mask[network.indices]
+    src, dst, w = rows[keep], network.indices[keep], np.asarray(network.weights)[keep]
+    order = np.argsort(w, kind='stable')
+    src, dst, w = src[order], dst[order], w[order]
+
+    thresholds = sorted(thresholds)
+    start = np.searchsorted(w, thresholds[0], side='left')
+    sets = {}
+    for i, j in zip(src[start:], dst[start:]):
+        sets.setdefault(i, set()).add(network.genes[j])
+        sets.setdefault(j, set()).add(network.genes[i])
+    dict_neighbors = {network.genes[i]: sets[i] for i in sorted(sets)}
+    yield thresholds[0], dict_neighbors, set(dict_neighbors)
+
+    for threshold in thresholds[1:]:
+        stop = np.searchsorted(w, threshold, side='left')
+        changed = set()
+        for i, j in zip(src[start:stop], dst[start:stop]):
+            g1, g2 = network.genes[i], network.genes[j]
+            dict_neighbors[g1].discard(g2)
+            dict_neighbors[g2].discard(g1)
+            changed.update((g1, g2))
+        for g in changed:
+            if not dict_neighbors[g]:
+                del dict_neighbors[g]
+        start = stop
+        yield threshold, dict_neighbors, changed
+
+
+def from_edge_list(edges, weights=None):
+    '''
+    Build a Network from (g1, g2) symbol pairs. Duplicate edges keep the first weight.
+    '''
+    gene_index = {}
+    src = np.empty(len(edges), dtype=np.int64)
+    dst = np.empty(len(edges), dtype=np.int64)
+    for k, (g1, g2) in enumerate(edges):
+        src[k] = gene_index.setdefault(g1, len(gene_index))
+        dst[k] = gene_index.setdefault(g2, len(gene_index))
+    if weights is None:
+        w = np.ones(len(edges))
+    else:
+        w = np.asarray(weights, dtype=float)
+    n = len(gene_index)
+
+    # undirected, first occurrence of each edge
+    lo = np.minimum(src, dst)
+    hi = np.maximum(src, dst)
+    _, first = np.unique(lo*n + hi, return_index=True)
+    lo, hi, w = lo[first], hi[first], w[first]
+
+    loop = lo == hi
+    rows = np.concatenate([lo, hi[~loop]])
+    cols = np.concatenate([hi, lo[~loop]])
+    w = np.concatenate([w, w[~loop]])
+
+    order = np.lexsort((cols, rows))
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+
+    return Network(list(gene_index), indptr, cols[order].astype(np.int32), w[order])
+
+
+def read_index_file(index_file):
+    '''{ID: symbol} from an index file, whitespace separated'''
+    with open(index_file, 'r') as f:
+        return {line.split()[0]: line.split()[1] for line in f if line.strip()}
+
+
+def parse_network(edge_file, index_file=None, upper=True):
+    '''
+    Parse an edge file. When index_file is given and the edge file contains IDs,
+    the IDs are mapped to symbols; otherwise the edge file holds symbol pairs.
+    '''
+    indices = read_index_file(index_file) if index_file is not None else None
+    edges = []
+    weights = []
+    with open(edge_file, 'r') as f:
+        lines = [line.split() for line in f if line.strip()]
+
+    # the format is decided on the first edge: ID pairs are mapped through the index file
+    if indices is not None and lines and not (lines[0][0] in indices and lines[0][1] in indices):
+        indices = None
+    for line in lines:
+        g1, g2 = line[0], line[1]
+        if indices is not None:
+            g1, g2 = indices[g1], indices[g2]
+        if upper:
+            g1, g2 = g1.upper(), g2.upper()
+        edges.append((g1, g2))
+        weights.append(float(line[2]) if len(line) > 2 else 1.0)
+
+    return from_edge_list(edges, weights)
+
+
+def cache_path_for(edge_file):
+    '''directory of the CSR cache of an edge file'''
+    return edge_file + CACHE_SUFFIX
+
+
+def _is_valid(header, sources, upper):
+    if header is None or header.get('version') != CACHE_VERSION or header.get('upper') != upper:
+        return False
+    if sorted(header['sources']) != sorted(sources):
+        return False
+    for path, stamp in header['sources'].items():
+        current = source_stamp(path, with_hash=False)
+        if current['size'] != stamp['size']:
+            return False
+        if current['mtime'] != stamp['mtime'] and file_hash(path) != stamp['sha1']:
+            return False
+    return True
+
+
+def write_cache(network, cache_path, sources, upper=True):
+    '''write a Network as a directory of arrays and a JSON header'''
+    if not os.path.exists(cache_path):
+        os.makedirs(cache_path)
+    header_file = os.path.join(cache_path, 'header.json')
+    if os.path.exists(header_file):
+        os.remove(header_file)
+
+    for name in ARRAYS:
+        outfile = os.path.join(cache_path, name + '.npy')
+        with open(outfile + '.tmp', 'wb') as f:
+            np.save(f, getattr(network, name))
+        os.replace(outfile + '.tmp', outfile)
+
+    header = {'version': CACHE_VERSION, 'upper': upper, 'genes': network.genes,
+              'sources': {path: source_stamp(path) for path in sources}}
+    with open(header_file + '.tmp', 'w') as f:
+        json.dump(header, f)
+    os.replace(header_file + '.tmp', header_file)
+
+
+def read_cache(cache_path, mmap_mode='r'):
+    '''load a Network from its cache directory'''
+    header = read_header(cache_path)
+    arrays = [np.load(os.path.join(cache_path, name + '.npy'), mmap_mode=mmap_mode) for name in ARRAYS]
+    return Network(header['genes'], *arrays)
+
+
+def load_network(edge_file, index_file=None, upper=True, use_cache=True):
+    '''
+    Network from an edge file (and optional index file), read from its CSR cache
+    when the sources did not change.
+    '''
+    if not use_cache:
+        return parse_network(edge_file, index_file=index_file, upper=upper)
+
+    sources = [os.path.abspath(edge_file)]
+    if index_file is not None:
+        sources.append(os.path.abspath(index_file))
+    cache_path = cache_path_for(edge_file)
+
+    if _is_valid(read_header(cache_path), sources, upper):
+        return read_cache(cache_path)
+
+    network = parse_network(edge_file, index_file=index_file, upper=upper)
+    try:
+        write_cache(network, cache_path, sources, upper=upper)
+    except OSError as e:
+        warnings.warn('could not write network cache {}: {}'.format(cache_path, e))
+
+    return network
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+Process pool helpers for the evaluation scripts.
+
+Workers are forked from the calling process, so module level data of the scripts
+(networks, reference genes, loaded result tables) is inherited read-only instead of
+being pickled with every task. Only the task arguments and the results are pickled.
+Larger read-only inputs built inside a function (e.g. the p-value rows of a method)
+are handed to the workers the same way through the shared keyword arguments.
+"""
+
+import multiprocessing
+import warnings
+
+# keyword arguments shared by all tasks of the running pool, inherited by the workers
+_shared = {}
+
+
+def _run_task(task):
+    func, args, kwargs = task
+    return func(*args, **dict(_shared, **kwargs))
+
+
+def split_units(items, workers, units_per_worker=4):
+    '''
+    Split items into consecutive work units, about units_per_worker units per worker.
+    '''
+    items = list(items)
+    if workers <= 1 or not items:
+        return [items]
+    size = -(-len(items)//(workers*units_per_worker))
+    return [items[i:i+size] for i in range(0, len(items), size)]
+
+
+def run_tasks(func, tasks, workers=1, shared=None):
+    '''
+    Yield func(*args, **shared, **kwargs) for every (args, kwargs) in tasks, in task order.
+    workers: number of processes, 1 runs the tasks in the calling process. Tasks started
+    from a pool worker always run serially, pool workers can not fork pools,
+    shared: read-only keyword arguments of every task, inherited by the workers.
+    '''
+    global _shared
+    tasks = list(tasks)
+    shared = shared or {}
+    if workers > 1 and 'fork' not in multiprocessing.get_all_start_methods():
+        warnings.warn('process pool needs the fork start method, running serially')
+        workers = 1
+    if multiprocessing.current_process().daemon:
+        workers = 1
+
+    if workers <= 1 or len(tasks) <= 1:
+        for args, kwargs in tasks:
+            yield func(*args, **dict(shared, **kwargs))
+        return
+
+    _shared = shared
+    try:
+        ctx = multiprocessing.get_context('fork')
+        with ctx.Pool(min(workers, len(tasks))) as pool:
+            for result in pool.imap(_run_task, [(func, args, kwargs) for args, kwargs in tasks]):
+                yield result
+    finally:
+        _shared = {}
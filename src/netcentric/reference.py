@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+Registry of reference gene sets (CGC, CGC SNV filtered, IntOGen, ...).
+
+Genes are interned to integer IDs once, and every set is one bit of a per gene
+integer mask, so several reference sets share one gene dictionary and membership
+of a gene in every set is a single lookup.
+"""
+
+import numpy as np
+
+MAX_SETS = 64
+
+
+class ReferenceSets(object):
+    '''
+    Reference gene sets as bitmasks over interned gene IDs.
+    genes: interned gene symbols, indexed by gene ID,
+    names: set names, set i is bit i of the masks.
+    '''
+
+    def __init__(self):
+        self.genes = []
+        self.gene_index = {}
+        self.names = []
+        self.bits = np.zeros(0, dtype=np.uint64)
+        self._members = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __contains__(self, name):
+        return name in self.names
+
+    def intern(self, genes):
+        '''gene IDs of genes, new genes get the next free IDs'''
+        ids = []
+        for g in genes:
+            if g not in self.gene_index:
+                self.gene_index[g] = len(self.genes)
+                self.genes.append(g)
+            ids.append(self.gene_index[g])
+        if len(self.bits) < len(self.genes):
+            self.bits = np.concatenate([self.bits, np.zeros(len(self.genes) - len(self.bits), dtype=np.uint64)])
+        return np.array(ids, dtype=np.int64)
+
+    def add(self, name, genes):
+        '''register the set name, replacing an earlier set of that name'''
+        if name in self.names:
+            bit = self.bit(name)
+            self.bits &= ~bit
+        elif len(self.names) == MAX_SETS:
+            raise ValueError('at most {} reference sets'.format(MAX_SETS))
+        else:
+            self.names.append(name)
+            bit = self.bit(name)
+        ids = self.intern(genes)
+        self.bits[ids] |= bit
+        self._members.pop(name, None)
+
+    def bit(self, name):
+        return np.uint64(1) << np.uint64(self.names.index(name))
+
+    def mask(self, name):
+        '''boolean array over gene IDs, True for the genes of the set'''
+        return (self.bits & self.bit(name)) != 0
+
+    def ids(self, name):
+        return np.flatnonzero(self.mask(name))
+
+    def genes_of(self, name):
+        '''genes of the set, in order of gene IDs'''
+        return [self.genes[i] for i in self.ids(name)]
+
+    def member_set(self, name):
+        '''frozenset of the genes of the set, for membership tests in loops'''
+        if name not in self._members:
+            self._members[name] = frozenset(self.genes_of(name))
+        return self._members[name]
+
+    def contains(self, name, gene):
+        i = self.gene_index.get(gene)
+        return i is not None and bool(self.bits[i] & self.bit(name))
+
+    def sets_of(self, gene):
+        '''names of the sets containing gene'''
+        i = self.gene_index.get(gene)
+        if i is None:
+            return []
+        return [name for k, name in enumerate(self.names) if int(self.bits[i]) >> k & 1]
+
+    def union(self, names=None):
+        '''genes in any of the sets names (all sets by default), in order of gene IDs'''
+        names = self.names if names is None else names
+        bits = np.uint64(0)
+        for name in names:
+            bits |= self.bit(name)
+        return [self.genes[i] for i in np.flatnonzero(self.bits & bits)]
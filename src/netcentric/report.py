@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+Timing harness: wall time, CPU time, peak resident memory and throughput of named
+stages, written as a JSON or CSV report. Stages can optionally be profiled with
+cProfile, one .prof file per stage.
+
+The peak RSS of a stage (peak_rss_mb) is its own: the peak of the process is reset
+when the stage starts (Linux /proc/self/clear_refs) and read when it ends, None where
+it cannot be reset. process_peak_rss_mb and children_peak_rss_mb are the peaks of the
+process and of its waited-for worker processes since the start of the run.
+"""
+
+import cProfile
+import csv
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+STAGE_FIELDS = ['stage', 'wall_s', 'cpu_s', 'peak_rss_mb', 'process_peak_rss_mb', 'children_peak_rss_mb', 'items', 'items_per_s']
+
+# highest peak RSS measured in this process, and running peaks of the open scopes, innermost last
+_process_peak = [0.0]
+_scopes = []
+
+
+def peak_rss_mb(children=False):
+    '''peak resident set size of this process (or of its waited-for children) in MB'''
+    if resource is None:
+        return float('nan')
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF)
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    scale = 1024.0*1024.0 if sys.platform == 'darwin' else 1024.0
+    if children:
+        return usage.ru_maxrss/scale
+    # ru_maxrss restarts when the peak is reset by peak_rss_scope
+    _process_peak[0] = max(usage.ru_maxrss/scale, _hwm_mb() or 0.0, _process_peak[0])
+    return _process_peak[0]
+
+
+def _hwm_mb():
+    '''peak RSS of this process since its last reset (VmHWM) in MB, None without /proc'''
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])/1024.0
+    except (IOError, OSError, ValueError):
+        pass
+    return None
+
+
+def _reset_hwm():
+    '''reset the peak RSS of this process to its current RSS, False when not possible'''
+    peak_rss_mb()
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except (IOError, OSError):
+        return False
+
+
+@contextmanager
+def peak_rss_scope():
+    '''
+    Measure the peak RSS of the enclosed block alone. The yielded dictionary receives
+    peak_rss_mb when the block ends, None where the peak cannot be reset. Scopes nest,
+    an enclosing scope keeps the peaks of the scopes inside it.
+    '''
+    out = {}
+    hwm = _hwm_mb()
+    if _scopes and hwm is not None:
+        _scopes[-1] = max(_scopes[-1], hwm)
+    measured = hwm is not None and _reset_hwm()
+    _scopes.append(0.0)
+    try:
+        yield out
+    finally:
+        inner = _scopes.pop()
+        hwm = _hwm_mb() if measured else None
+        out['peak_rss_mb'] = None if hwm is None else max(hwm, inner)
+        if hwm is not None:
+            _process_peak[0] = max(_process_peak[0], out['peak_rss_mb'])
+            if _scopes:
+                _scopes[-1] = max(_scopes[-1], out['peak_rss_mb'])
+
+
+class RunReport(object):
+    '''
+    Records of the stages of a run.
+    meta: run level information (cancer type, methods, sizes, ...),
+    stages: one dictionary per stage, in order of completion,
+    profile_dir: when given, every stage is run under cProfile and dumped there.
+    '''
+
+    def __init__(self, profile_dir=None, **meta):
+        self.meta = meta
+        self.stages = []
+        self.profile_dir = profile_dir
+
+    @contextmanager
+    def stage(self, name, items=None, **info):
+        '''
+        Time the enclosed block. The yielded record can be updated inside the block,
+        e.g. record['items'] = number of pairs processed.
+        '''
+        record = dict(info, stage=name, items=items)
+        profile = cProfile.Profile() if self.profile_dir is not None else None
+        start = time.perf_counter()
+        start_cpu = time.process_time()
+        if profile is not None:
+            profile.enable()
+        try:
+            with peak_rss_scope() as peak:
+                yield record
+        finally:
+            if profile is not None:
+                profile.disable()
+                record['profile'] = self._dump_profile(profile, record)
+            record['wall_s'] = time.perf_counter() - start
+            record['cpu_s'] = time.process_time() - start_cpu
+            record['peak_rss_mb'] = peak['peak_rss_mb']
+            record['process_peak_rss_mb'] = peak_rss_mb()
+            record['children_peak_rss_mb'] = peak_rss_mb(children=True)
+            record['items_per_s'] = record['items']/record['wall_s'] if record['items'] and record['wall_s'] > 0 else None
+            self.stages.append(record)
+
+    def _dump_profile(self, profile, record):
+        '''write the profile of a stage, named after the stage and its info, returns the path'''
+        if not os.path.exists(self.profile_dir):
+            os.makedirs(self.profile_dir)
+        parts = [str(v) for k, v in sorted(record.items()) if k not in ('stage', 'items')]
+        name = '_'.join([record['stage']] + parts).replace(os.sep, '-')
+        outfile = os.path.join(self.profile_dir, '{}_{}.prof'.format(name, os.getpid()))
+        profile.dump_stats(outfile)
+        return outfile
+
+    def add(self, name, wall_s, items=None, peak_rss=None, **info):
+        '''add a stage measured elsewhere, e.g. in a subprocess'''
+        record = dict(info, stage=name, items=items, wall_s=wall_s, peak_rss_mb=peak_rss)
+        record['items_per_s'] = items/wall_s if items and wall_s > 0 else None
+        self.stages.append(record)
+        return record
+
+    def extend(self, records):
+        self.stages.extend(records)
+
+    def to_dict(self):
+        return {'meta': self.meta, 'stages': self.stages}
+
+    def write_json(self, outfile):
+        _makedirs_for(outfile)
+        with open(outfile, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2, default=str)
+
+    def write_csv(self, outfile):
+        '''one row per stage, the stage fields first'''
+        _makedirs_for(outfile)
+        extra = []
+        for record in self.stages:
+            extra.extend(k for k in record if k not in STAGE_FIELDS and k not in extra)
+        with open(outfile, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=STAGE_FIELDS + extra)
+            writer.writeheader()
+            for record in self.stages:
+                writer.writerow(record)
+
+
+def _makedirs_for(outfile):
+    dirname = os.path.dirname(outfile)
+    if dirname and not os.path.exists(dirname):
+        os.makedirs(dirname)
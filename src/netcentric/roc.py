@@ -0,0 +1,462 @@
+# -*- coding: utf-8 -*-
+"""
+ROC analysis based on tissue-specificity: ME -log p-values rank tissue specific
+(top) against non tissue specific (bottom) TSN edges, for CGC-CGC pairs and for
+randomly sampled nonCGC-nonCGC pairs of the same class sizes, per cancer type and
+summarized over cancer types. Used by me_on_tsn_ntsn_roc_curve.py.
+
+Curves and AUROCs are computed on arrays: a curve by one sort and cumulative sums,
+with tied scores as one step, and an AUROC from the ranks of the scores (Mann-Whitney U,
+ties counted half) for a whole batch of samples at once, without building its curve.
+The AUPRC is the average precision over the same steps.
+
+For a sweep over the top and bottom cutoffs, the TSN edges of a method are sorted by
+their fraction once (pair_arrays), so the classes of every cutoff are slices of them.
+
+matplotlib is imported by the plotting functions only.
+"""
+
+import string
+
+import numpy as np
+import pandas as pd
+from scipy.stats import rankdata
+
+from netcentric.datasets import METHOD_NAMES
+from netcentric.streams import RandomStreams
+
+
+def get_pvalues(table, m, row_genes):
+    """get mutex -log pvalues of row_genes from a result table"""
+    rows = table.rows(row_genes)
+    print('min pval:',table.min_pval)
+
+    return {g:rows.get(g,{}) for g in row_genes}
+
+
+def tsn_class_pairs(dict_tsn_conf, cosmic_genes, genes, top_n=1.0, bottom_n=0.5):
+    '''CGC-CGC TSN edges of the cohort genes, split into top (v >= top_n) and bottom (v <= bottom_n)'''
+    cosmic_genes, genes = set(cosmic_genes), set(genes)
+    dict_tsn_conf_cosmic_nb = {k:v for k,v in dict_tsn_conf.items() if k[0] in cosmic_genes and k[1] in cosmic_genes and k[0] in genes and k[1] in genes}
+    dict_tsn_conf_cosmic_nb_top = {k:v for k,v in dict_tsn_conf_cosmic_nb.items() if v>=top_n}
+    dict_tsn_conf_cosmic_nb_bottom = {k:v for k,v in dict_tsn_conf_cosmic_nb.items() if v<=bottom_n}
+    return dict_tsn_conf_cosmic_nb_top, dict_tsn_conf_cosmic_nb_bottom
+
+
+def _steps(scores, labels):
+    '''true and false pairs ranked at or above every step of pairs ranked by decreasing scores, and the labels'''
+    scores = np.asarray(scores, dtype=float)
+    labels = np.asarray(labels) == 1
+    order = np.argsort(-scores, kind='mergesort')
+    scores, labels = scores[order], labels[order]
+    # the last pair of every run of tied scores closes its step
+    last = np.ones(len(scores), dtype=bool)
+    last[:-1] = scores[1:] != scores[:-1]
+    return np.cumsum(labels)[last], np.cumsum(~labels)[last], labels
+
+
+def roc_curve(scores, labels, tpfn=None, fptn=None):
+    '''
+    ROC curve of pairs ranked by decreasing scores, labels 1 for true and 0 for false pairs.
+    Pairs of tied scores are one step of the curve. TPR = sum_true/tpfn and FPR = sum_false/fptn
+    (the class sizes when not given). Returns the arrays fpr, tpr, from (0, 0).
+    '''
+    sum_true, sum_false, labels = _steps(scores, labels)
+
+    tpfn = float(labels.sum() if tpfn is None else tpfn)
+    fptn = float((~labels).sum() if fptn is None else fptn)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.append(0.0, sum_false/fptn), np.append(0.0, sum_true/tpfn)
+
+
+def rank_auc(pos, neg, tpfn=None, fptn=None):
+    '''
+    AUROC of true pair scores pos against false pair scores neg from their ranks: the
+    Mann-Whitney U of pos, ties counted half, over tpfn*fptn (the class sizes when not given).
+    This is the area under roc_curve of the same pairs.
+    pos, neg: 1d arrays, or 2d arrays of a batch of samples, one per row; returns one AUROC per row.
+    '''
+    pos = np.asarray(pos, dtype=float)
+    neg = np.asarray(neg, dtype=float)
+    batch = pos.ndim == 2
+    pos, neg = np.atleast_2d(pos), np.atleast_2d(neg)
+    n_pos, n_neg = pos.shape[1], neg.shape[1]
+    tpfn = float(n_pos if tpfn is None else tpfn)
+    fptn = float(n_neg if fptn is None else fptn)
+
+    if n_pos == 0 or n_neg == 0 or tpfn == 0 or fptn == 0:
+        aucs = np.full(pos.shape[0], np.nan)
+    else:
+        ranks = rankdata(np.concatenate([pos, neg], axis=1), axis=1)
+        aucs = (ranks[:, :n_pos].sum(axis=1) - n_pos*(n_pos+1)/2.0)/(tpfn*fptn)
+    return aucs if batch else aucs[0]
+
+
+def pr_curve(scores, labels, tpfn=None):
+    '''
+    Precision-recall curve of pairs ranked by decreasing scores, on the steps of roc_curve.
+    Recall = sum_true/tpfn (the true pairs when not given), precision = sum_true/(sum_true+sum_false).
+    Returns the arrays recall, precision, from (0, 1).
+    '''
+    sum_true, sum_false, labels = _steps(scores, labels)
+
+    tpfn = float(labels.sum() if tpfn is None else tpfn)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.append(0.0, sum_true/tpfn), np.append(1.0, sum_true/(sum_true+sum_false))
+
+
+def average_precision(pos, neg, tpfn=None):
+    '''
+    AUPRC of true pair scores pos against false pair scores neg as the average precision: the sum
+    over the steps of pr_curve of the recall gained times the precision at the step.
+    pos, neg: 1d arrays, or 2d arrays of a batch of samples, one per row; returns one AUPRC per row.
+    '''
+    pos = np.asarray(pos, dtype=float)
+    neg = np.asarray(neg, dtype=float)
+    batch = pos.ndim == 2
+    pos, neg = np.atleast_2d(pos), np.atleast_2d(neg)
+    n_pos = pos.shape[1]
+    tpfn = float(n_pos if tpfn is None else tpfn)
+
+    if n_pos == 0 or tpfn == 0:
+        aps = np.full(pos.shape[0], np.nan)
+    else:
+        scores = np.concatenate([pos, neg], axis=1)
+        order = np.argsort(-scores, axis=1, kind='mergesort')
+        scores = np.take_along_axis(scores, order, axis=1)
+        sum_true = np.cumsum(order < n_pos, axis=1)
+        last = np.ones(scores.shape, dtype=bool)
+        last[:, :-1] = scores[:, 1:] != scores[:, :-1]
+        # true pairs above the previous step: sum_true is nondecreasing, so the running maximum of its step values
+        closed = np.maximum.accumulate(np.where(last, sum_true, 0), axis=1)
+        previous = np.concatenate([np.zeros((len(scores), 1), dtype=closed.dtype), closed[:, :-1]], axis=1)
+        precision = sum_true/np.arange(1.0, scores.shape[1]+1)
+        aps = np.where(last, (sum_true - previous)*precision, 0).sum(axis=1)/tpfn
+    return aps if batch else aps[0]
+
+
+def cgc_pair_values(m, dict_tsn_conf, dict_mex_m, cosmic_genes, genes, top_n=1.0, bottom_n=0.5):
+    '''[g1, g2, mex, class] of the CGC-CGC TSN edges, class 1 for top and 0 for bottom edges'''
+    cosmic_genes, genes = set(cosmic_genes), set(genes)
+    list_vals = []
+    for k,v in dict_tsn_conf.items():
+        g1,g2=k
+        if g1 in cosmic_genes and g2 in cosmic_genes and g1 in genes and g2 in genes:
+            if m!='wext':
+                if v>=top_n:
+                    list_vals.append([g1,g2,dict_mex_m[g1][g2],1])
+                elif v<=bottom_n:
+                    list_vals.append([g1,g2,dict_mex_m[g1][g2],0])
+            else:
+                if v>=top_n:
+                    if g2 in dict_mex_m[g1]:
+                        list_vals.append([g1,g2,dict_mex_m[g1][g2],1])
+                    else:
+                        continue
+                elif v<=bottom_n:
+                    if g2 in dict_mex_m[g1]:
+                        list_vals.append([g1,g2,dict_mex_m[g1][g2],0])
+                    else:
+                        continue
+    return list_vals
+
+
+def noncgc_pair_values(m, dict_tsn_conf, dict_mex_m, cosmic_genes, genes, top_n=1.0, bottom_n=0.5):
+    '''[g1, g2, mex, class] of the nonCGC-nonCGC TSN edges, as top and bottom lists'''
+    cosmic_genes, genes = set(cosmic_genes), set(genes)
+    list_vals2_temp_top = []
+    list_vals2_temp_bottom = []
+    for k,v in dict_tsn_conf.items():
+        g1,g2=k
+        if g1 not in cosmic_genes and g2 not in cosmic_genes and g1 in genes and g2 in genes:
+            if m!='wext':
+                if v>=top_n:
+                    list_vals2_temp_top.append([g1,g2,dict_mex_m[g1][g2],1])
+                elif v<=bottom_n:
+                    list_vals2_temp_bottom.append([g1,g2,dict_mex_m[g1][g2],0])
+            else:
+                if v>=top_n:
+                    if g2 in dict_mex_m[g1]:
+                        list_vals2_temp_top.append([g1,g2,dict_mex_m[g1][g2],1])
+                    else:
+                        list_vals2_temp_top.append([g1,g2,0,1])
+                elif v<=bottom_n:
+                    if g2 in dict_mex_m[g1]:
+                        list_vals2_temp_bottom.append([g1,g2,dict_mex_m[g1][g2],0])
+                    else:
+                        continue
+    return list_vals2_temp_top, list_vals2_temp_bottom
+
+
+def _scores(list_vals):
+    '''-log p-values and classes of [g1, g2, mex, class] pairs as arrays'''
+    return (np.array([v[2] for v in list_vals], dtype=float).reshape(-1),
+            np.array([v[3] for v in list_vals], dtype=int).reshape(-1))
+
+
+def sample_indices(streams, m, name, n, k, iterations):
+    '''
+    (iterations, k) indices of k of n pairs sampled without replacement, row i from the stream
+    of (m, name, i) as RandomStreams.sample
+    '''
+    return np.array([streams.generator(m, name, i).choice(n, size=k, replace=False) for i in range(iterations)],
+                    dtype=np.int64).reshape(iterations, k)
+
+
+def tsn_roc(m, dict_tsn_conf, dict_mex_m, cosmic_genes, genes, streams=None, top_n=1.0, bottom_n=0.5, iterations=100):
+    '''
+    ROC curves of a method.
+    dict_tsn_conf: {(g1, g2): tissue specific fraction},
+    dict_mex_m: {g1: {g2: -log p}} of the method,
+    streams: RandomStreams, each (method, iteration) samples the nonCGC pairs from its own stream.
+
+    Returns the dictionary of roc_from_scores.
+    '''
+    dict_tsn_conf_cosmic_nb_top, dict_tsn_conf_cosmic_nb_bottom = tsn_class_pairs(dict_tsn_conf, cosmic_genes, genes, top_n, bottom_n)
+
+    # COSMIC-COSMIC
+    '''
+    TPR = Sensitivity = sum_true/len(dict_tsn_conf_cosmic_nb_top),
+    FPR = 1-Specificity = Sum_false/len(dict_tsn_conf_cosmic_nb_bottom).
+    '''
+    tpfn, fptn = len(dict_tsn_conf_cosmic_nb_top), len(dict_tsn_conf_cosmic_nb_bottom)
+    scores, labels = _scores(cgc_pair_values(m, dict_tsn_conf, dict_mex_m, cosmic_genes, genes, top_n, bottom_n))
+
+    #Noncosmic-Noncosmic
+    list_vals2_temp_top, list_vals2_temp_bottom = noncgc_pair_values(m, dict_tsn_conf, dict_mex_m, cosmic_genes, genes, top_n, bottom_n)
+    scores_top, _ = _scores(list_vals2_temp_top)
+    scores_bottom, _ = _scores(list_vals2_temp_bottom)
+
+    return roc_from_scores(m, {'cgc_top': scores[labels == 1], 'cgc_bottom': scores[labels == 0],
+                               'nc_top': scores_top, 'nc_bottom': scores_bottom}, tpfn, fptn, streams, iterations)
+
+
+def roc_from_scores(m, scores, tpfn, fptn, streams=None, iterations=100):
+    '''
+    ROC and precision-recall curves of a method from the -log p-values of its pairs.
+    scores: {'cgc_top', 'cgc_bottom', 'nc_top', 'nc_bottom'} arrays, tpfn, fptn: the sizes of the
+    top and bottom CGC-CGC classes, also the sizes of the nonCGC samples,
+    streams: RandomStreams, each (method, iteration) samples the nonCGC pairs from its own stream.
+
+    Returns a dictionary with the CGC-CGC curve 'cgc_fpr', 'cgc_tpr', its 'cgc_auc', the precision-recall
+    curve 'cgc_recall', 'cgc_precision' and its 'cgc_ap', the AUCs and AUPRCs of the nonCGC samples
+    'nc_aucs', 'nc_aps' and the median AUPRC 'nc_ap', the sample of median AUC: 'nc_auc', 'nc_fpr',
+    'nc_tpr', 'nc_recall', 'nc_precision', and the arguments (for netcentric.roc_stats): 'scores',
+    'tpfn', 'fptn'.
+    '''
+    if streams is None:
+        streams = RandomStreams()
+    cgc_scores = np.concatenate([scores['cgc_top'], scores['cgc_bottom']])
+    cgc_labels = np.repeat([1, 0], [len(scores['cgc_top']), len(scores['cgc_bottom'])])
+    cgc_fpr, cgc_tpr = roc_curve(cgc_scores, cgc_labels, tpfn, fptn)
+    cgc_recall, cgc_precision = pr_curve(cgc_scores, cgc_labels, tpfn)
+    cgc_auc = rank_auc(scores['cgc_top'], scores['cgc_bottom'], tpfn, fptn)
+    cgc_ap = average_precision(scores['cgc_top'], scores['cgc_bottom'], tpfn)
+    scores_top, scores_bottom = scores['nc_top'], scores['nc_bottom']
+
+    # all samples at once, each (method, iteration) samples from its own stream; only the median sample's curve is built
+    idx_top = sample_indices(streams, m, 'top', len(scores_top), tpfn, iterations)
+    idx_bottom = sample_indices(streams, m, 'bottom', len(scores_bottom), fptn, iterations)
+    list_auc = rank_auc(scores_top[idx_top], scores_bottom[idx_bottom])
+    list_ap = average_precision(scores_top[idx_top], scores_bottom[idx_bottom])
+
+    med_auc_idx = np.argsort(list_auc)[len(list_auc)//2]
+    nc_scores = np.concatenate([scores_top[idx_top[med_auc_idx]], scores_bottom[idx_bottom[med_auc_idx]]])
+    nc_labels = np.repeat([1, 0], [tpfn, fptn])
+    nc_fpr, nc_tpr = roc_curve(nc_scores, nc_labels)
+    nc_recall, nc_precision = pr_curve(nc_scores, nc_labels)
+
+    return {'cgc_fpr': cgc_fpr, 'cgc_tpr': cgc_tpr, 'cgc_auc': cgc_auc,
+            'cgc_recall': cgc_recall, 'cgc_precision': cgc_precision, 'cgc_ap': cgc_ap,
+            'nc_aucs': list_auc.tolist(), 'nc_auc': list_auc[med_auc_idx],
+            'nc_aps': list_ap.tolist(), 'nc_ap': np.median(list_ap) if len(list_ap) else np.nan,
+            'nc_fpr': nc_fpr, 'nc_tpr': nc_tpr, 'nc_recall': nc_recall, 'nc_precision': nc_precision,
+            'scores': scores, 'tpfn': tpfn, 'fptn': fptn}
+
+
+def pair_arrays(m, dict_tsn_conf, dict_mex_m, cosmic_genes, genes):
+    '''
+    The CGC-CGC and nonCGC-nonCGC TSN edges of the cohort genes for the cutoffs of cutoff_scores,
+    sorted once by their tissue specific fraction. Returns {'cgc': arrays, 'nc': arrays}, each
+    {'fraction', 'score': -log p, 'tested': False for the pairs wext did not test,
+    'position': order of the edge in dict_tsn_conf}.
+    '''
+    cosmic_genes, genes = set(cosmic_genes), set(genes)
+    rows = {'cgc': [], 'nc': []}
+    for i, (k,v) in enumerate(dict_tsn_conf.items()):
+        g1,g2=k
+        if g1 not in genes or g2 not in genes:
+            continue
+        if g1 in cosmic_genes and g2 in cosmic_genes:
+            group = 'cgc'
+        elif g1 not in cosmic_genes and g2 not in cosmic_genes:
+            group = 'nc'
+        else:
+            continue
+        if m!='wext':
+            rows[group].append((v, dict_mex_m[g1][g2], True, i))
+        else:
+            rows[group].append((v, dict_mex_m[g1].get(g2, 0), g2 in dict_mex_m[g1], i))
+
+    arrays = {}
+    for group, group_rows in rows.items():
+        fraction, score, tested, position = [np.array(col, dtype=dtype).reshape(-1) for col, dtype in
+                                             zip(list(zip(*group_rows)) or [(), (), (), ()], (float, float, bool, np.int64))]
+        order = np.argsort(fraction, kind='mergesort')
+        arrays[group] = {'fraction': fraction[order], 'score': score[order], 'tested': tested[order], 'position': position[order]}
+    return arrays
+
+
+def _class_scores(group, start, stop, untested=None):
+    '''scores of a slice of pair_arrays in order of dict_tsn_conf, untested pairs are left out or scored untested'''
+    order = np.argsort(group['position'][start:stop], kind='mergesort')
+    score, tested = group['score'][start:stop][order], group['tested'][start:stop][order]
+    return score[tested] if untested is None else np.where(tested, score, untested)
+
+
+def cutoff_scores(arrays, top_n=1.0, bottom_n=0.5):
+    '''
+    The scores of tsn_roc at the cutoffs top_n > bottom_n from pair_arrays: the top (v >= top_n) and
+    bottom (v <= bottom_n) pairs are the ends of the sorted fractions. Returns the scores and the
+    class sizes tpfn, fptn, the arguments of roc_from_scores.
+    '''
+    if top_n <= bottom_n:
+        raise ValueError('top cutoff {} is not above the bottom cutoff {}'.format(top_n, bottom_n))
+    cgc, nc = arrays['cgc'], arrays['nc']
+    cgc_top = np.searchsorted(cgc['fraction'], top_n, side='left')
+    cgc_bottom = np.searchsorted(cgc['fraction'], bottom_n, side='right')
+    nc_top = np.searchsorted(nc['fraction'], top_n, side='left')
+    nc_bottom = np.searchsorted(nc['fraction'], bottom_n, side='right')
+    # nonCGC top pairs wext did not test score 0, as in noncgc_pair_values
+    scores = {'cgc_top': _class_scores(cgc, cgc_top, None), 'cgc_bottom': _class_scores(cgc, 0, cgc_bottom),
+              'nc_top': _class_scores(nc, nc_top, None, untested=0.0), 'nc_bottom': _class_scores(nc, 0, nc_bottom)}
+    return scores, len(cgc['fraction']) - cgc_top, cgc_bottom
+
+
+def cutoff_sweep(m, arrays, cutoffs, streams=None, iterations=100):
+    '''
+    ROC and precision-recall curves of a method for every (top_n, bottom_n) of cutoffs, from the
+    pair_arrays of its -log p-values. Returns {(top_n, bottom_n): return value of roc_from_scores}.
+    '''
+    return {(top_n, bottom_n): roc_from_scores(m, *cutoff_scores(arrays, top_n, bottom_n), streams=streams, iterations=iterations)
+            for top_n, bottom_n in cutoffs}
+
+
+def plot_tsn_auroc(methods, rocs):
+    '''ROC curves of the methods, rocs: {method: return value of tsn_roc}'''
+    import matplotlib.pyplot as plt
+
+    fig, axes = plt.subplots(nrows=2, ncols=3,figsize=(30,16))
+    axes = np.array(axes)
+    axiter = axes.flat
+
+    for i, (ax,m) in enumerate(zip(axiter,methods)):
+        roc = rocs[m]
+        ax.plot(roc['cgc_fpr'],roc['cgc_tpr'],c='C0', linewidth=4.5)
+
+        ax.text(-0.1, 1.1, string.ascii_uppercase[i], transform=ax.transAxes,
+                size=25, weight='bold')
+
+        ax.plot(roc['nc_fpr'],roc['nc_tpr'], c='C1', linewidth=4.5)
+
+        ax.set_xlabel('False Positive Rate',fontsize=20)
+        ax.set_ylabel('True Positive Rate',fontsize=20)
+        ax.set_title(METHOD_NAMES[m],fontsize=25)
+        ax.tick_params(axis='both', labelsize=20)
+
+        legend_ = []
+
+        legend_.append('{} ({:.2f})'.format('CGC-CGC pairs', roc['cgc_auc']))
+        legend_.append('{} ({:.2f})'.format('nonCGC-nonCGC pairs', roc['nc_auc']))
+
+        ax.legend(legend_, loc=8,fancybox=True, fontsize=18, framealpha=0,
+                  edgecolor = 'b', ncol= 2, bbox_to_anchor=(0.5,-0.2))
+
+    fig.tight_layout()
+    plt.rcParams['pdf.fonttype'] = 42
+    plt.rcParams['font.family'] = 'Calibri'
+    return fig
+
+
+def auroc_summary(rocs):
+    '''table of the AUROCs, rocs: {cancer type: {method: return value of tsn_roc}}'''
+    rows = [[c, METHOD_NAMES[m], roc['cgc_auc'], roc['nc_auc']] for c in rocs for m, roc in rocs[c].items()]
+    return pd.DataFrame(rows, columns=['Cancer Type', 'Method', 'CGC-CGC AUROC', 'nonCGC-nonCGC AUROC'])
+
+
+def plot_pan_cancer_auroc(cancer_types, methods, rocs):
+    '''
+    AUROCs of the methods in every cancer type, rocs: {cancer type: {method: return value of tsn_roc}}.
+    Bars are the AUROCs of the CGC-CGC pairs, black marks those of the median nonCGC-nonCGC sample.
+    '''
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(max(12, 3*len(cancer_types)),10))
+    x = np.arange(len(cancer_types))
+    width = 0.8/len(methods)
+
+    for j, m in enumerate(methods):
+        pos = x - 0.4 + width*(j+0.5)
+        ax.bar(pos, [rocs[c][m]['cgc_auc'] for c in cancer_types], width, color='C{}'.format(j), label=METHOD_NAMES[m])
+        ax.scatter(pos, [rocs[c][m]['nc_auc'] for c in cancer_types], marker='_', s=4000*width, c='k', zorder=3,
+                   label='nonCGC-nonCGC pairs' if j == 0 else None)
+
+    ax.axhline(0.5, c='grey', linestyle='--', linewidth=2)
+    ax.set_xticks(x)
+    ax.set_xticklabels(cancer_types, fontsize=20)
+    ax.set_ylim(0, 1)
+    ax.set_ylabel('AUROC', fontsize=20)
+    ax.tick_params(axis='both', labelsize=20)
+    ax.legend(loc=8, fancybox=True, fontsize=18, framealpha=0, ncol=min(len(methods)+1, 4), bbox_to_anchor=(0.5,-0.25))
+
+    fig.tight_layout()
+    plt.rcParams['pdf.fonttype'] = 42
+    plt.rcParams['font.family'] = 'Calibri'
+    return fig
+
+
+def sweep_table(sweeps):
+    '''tidy table of the AUROCs and AUPRCs, one row per cutoff, sweeps: {cancer type: {method: return value of cutoff_sweep}}'''
+    rows = [[c, METHOD_NAMES[m], top_n, bottom_n, roc['tpfn'], roc['fptn'], roc['cgc_auc'], roc['cgc_ap'], roc['nc_auc'], roc['nc_ap']]
+            for c in sweeps for m, sweep in sweeps[c].items() for (top_n, bottom_n), roc in sweep.items()]
+    return pd.DataFrame(rows, columns=['Cancer Type', 'Method', 'Top Cutoff', 'Bottom Cutoff', 'Top Pairs', 'Bottom Pairs',
+                                       'CGC-CGC AUROC', 'CGC-CGC AUPRC', 'nonCGC-nonCGC AUROC', 'nonCGC-nonCGC AUPRC'])
+
+
+def plot_cutoff_sweep(methods, cutoffs, sweeps):
+    '''
+    AUROCs (solid) and AUPRCs (dashed) of the methods over the cutoffs, one panel per method,
+    sweeps: {method: return value of cutoff_sweep}.
+    '''
+    import matplotlib.pyplot as plt
+
+    fig, axes = plt.subplots(nrows=2, ncols=3,figsize=(30,16))
+    axes = np.array(axes)
+    axiter = axes.flat
+    x = np.arange(len(cutoffs))
+
+    for i, (ax,m) in enumerate(zip(axiter,methods)):
+        sweep = sweeps[m]
+        ax.plot(x, [sweep[k]['cgc_auc'] for k in cutoffs], c='C0', marker='o', linewidth=4.5, label='CGC-CGC AUROC')
+        ax.plot(x, [sweep[k]['nc_auc'] for k in cutoffs], c='C1', marker='o', linewidth=4.5, label='nonCGC-nonCGC AUROC')
+        ax.plot(x, [sweep[k]['cgc_ap'] for k in cutoffs], c='C0', marker='s', linestyle='--', linewidth=3, label='CGC-CGC AUPRC')
+        ax.plot(x, [sweep[k]['nc_ap'] for k in cutoffs], c='C1', marker='s', linestyle='--', linewidth=3, label='nonCGC-nonCGC AUPRC')
+        ax.axhline(0.5, c='grey', linestyle=':', linewidth=2)
+
+        ax.text(-0.1, 1.1, string.ascii_uppercase[i], transform=ax.transAxes,
+                size=25, weight='bold')
+        ax.set_xticks(x)
+        ax.set_xticklabels(['\u2265{:g}\n\u2264{:g}'.format(top_n, bottom_n) for top_n, bottom_n in cutoffs], fontsize=16)
+        ax.set_ylim(0, 1)
+        ax.set_xlabel('Top / bottom cutoff', fontsize=20)
+        ax.set_title(METHOD_NAMES[m],fontsize=25)
+        ax.set_ylabel('AUROC / AUPRC', fontsize=20)
+        # the cutoff labels keep their smaller size
+        ax.tick_params(axis='y', labelsize=20)
+
+        ax.legend(loc=8, fancybox=True, fontsize=18, framealpha=0, ncol=2, bbox_to_anchor=(0.5,-0.35))
+
+    fig.tight_layout()
+    plt.rcParams['pdf.fonttype'] = 42
+    plt.rcParams['font.family'] = 'Calibri'
+    return fig
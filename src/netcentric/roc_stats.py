@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+Uncertainty of the TSN AUROCs of netcentric.roc: bootstrap confidence intervals of the
+AUROC of the CGC-CGC pairs and of the median AUROC of the nonCGC-nonCGC samples, and a
+permutation p-value of their difference. These are the statistics cgc_auc and nc_auc of
+roc.roc_from_scores, replicated as they are computed there. Used by
+me_on_tsn_ntsn_roc_curve.py.
+
+Replicates are computed in batches that run in a process pool. The CGC-CGC samples of a
+batch are one array of shape (replicates, pairs), the nonCGC samples of a replicate one
+array of shape (iterations, pairs), scored at once by roc.rank_auc. Every batch draws
+from its own random stream, so the results do not depend on the number of processes.
+"""
+
+import numpy as np
+import pandas as pd
+
+from netcentric.datasets import METHOD_NAMES
+from netcentric.parallel import run_tasks
+from netcentric.roc import rank_auc
+from netcentric.streams import RandomStreams
+
+BATCH = 250
+COLS_CI = ['Method', 'CGC-CGC AUROC', 'CGC-CGC CI low', 'CGC-CGC CI high',
+           'nonCGC-nonCGC AUROC', 'nonCGC-nonCGC CI low', 'nonCGC-nonCGC CI high',
+           'Difference', 'Permutation p-value', 'Replicates']
+
+
+def bootstrap_aucs(pos, neg, replicates, generator, tpfn=None, fptn=None, size_pos=None, size_neg=None):
+    '''
+    AUROCs (roc.rank_auc) of replicates samples of size_pos true and size_neg false pairs, drawn
+    with replacement from the scores pos and neg (as many as there are by default).
+    '''
+    size_pos = len(pos) if size_pos is None else size_pos
+    size_neg = len(neg) if size_neg is None else size_neg
+    if len(pos) == 0 or len(neg) == 0:
+        return np.full(replicates, np.nan)
+    idx_pos = generator.integers(0, len(pos), size=(replicates, size_pos))
+    idx_neg = generator.integers(0, len(neg), size=(replicates, size_neg))
+    return rank_auc(pos[idx_pos], neg[idx_neg], tpfn, fptn)
+
+
+def _distinct_rows(n, rows, k, generator):
+    '''(rows, k) indices of k of n items sampled without replacement in every row, in no particular order'''
+    if n < 50*k:
+        # the k items of smallest random keys
+        return np.argpartition(generator.random((rows, n)), k - 1, axis=1)[:, :k] if k else np.zeros((rows, 0), dtype=np.int64)
+    idx = generator.integers(0, n, size=(rows, k))
+    # a row drawn with replacement is kept when its indices are distinct, as most are when k << n
+    ordered = np.sort(idx, axis=1)
+    for r in np.flatnonzero((ordered[:, 1:] == ordered[:, :-1]).any(axis=1)):
+        idx[r] = generator.choice(n, size=k, replace=False)
+    return idx
+
+
+def _median_auc(pos, neg):
+    '''median AUROC of the samples in the rows of pos and neg, the middle one as nc_auc of roc.roc_from_scores'''
+    aucs = np.sort(rank_auc(pos, neg))
+    return aucs[len(aucs)//2]
+
+
+def bootstrap_median_aucs(nc_top, nc_bottom, tpfn, fptn, iterations, replicates, generator):
+    '''
+    Median AUROCs (nc_auc of roc.roc_from_scores) of replicates bootstrap samples of the nonCGC
+    pairs. A replicate resamples the pairs of each class with replacement and takes the median
+    AUROC of iterations samples of tpfn true and fptn false pairs drawn from them without replacement.
+    Only the resampled pairs that are drawn are generated: they are independent draws from the pairs.
+    '''
+    if min(len(nc_top), len(nc_bottom), iterations) == 0:
+        return np.full(replicates, np.nan)
+
+    def resampled(values, k):
+        positions = _distinct_rows(len(values), iterations, k, generator)
+        drawn, inverse = np.unique(positions, return_inverse=True)
+        return values[generator.integers(0, len(values), size=len(drawn))][inverse.reshape(positions.shape)]
+
+    return np.array([_median_auc(resampled(nc_top, tpfn), resampled(nc_bottom, fptn)) for _ in range(replicates)])
+
+
+def _relabeled(cgc, nc, k, iterations, generator):
+    '''
+    The CGC labels of a class given to len(cgc) random pairs of cgc and nc: their scores, and
+    iterations samples of k of the other pairs without replacement.
+    '''
+    pool = np.concatenate([cgc, nc])
+    chosen = np.sort(_distinct_rows(len(pool), 1, len(cgc), generator)[0])
+    # the others in order of pool: position p is pool index p plus the chosen indices before it
+    positions = _distinct_rows(len(nc), iterations, k, generator)
+    others = positions + np.searchsorted(chosen - np.arange(len(chosen)), positions, side='right')
+    return pool[chosen], pool[others]
+
+
+def permutation_diffs(cgc_top, cgc_bottom, nc_top, nc_bottom, tpfn, fptn, iterations, replicates, generator):
+    '''
+    Differences of the CGC-CGC AUROC and the median nonCGC AUROC (cgc_auc - nc_auc of
+    roc.roc_from_scores) with the CGC labels permuted. A replicate gives the CGC labels of each
+    class to random pairs of the CGC and nonCGC pairs of the class, and the median AUROC is taken
+    over iterations samples of tpfn true and fptn false pairs of the others.
+    '''
+    if min(len(cgc_top), len(cgc_bottom), len(nc_top), len(nc_bottom), iterations) == 0:
+        return np.full(replicates, np.nan)
+    diffs = np.empty(replicates)
+    for r in range(replicates):
+        cgc_pos, nc_pos = _relabeled(cgc_top, nc_top, tpfn, iterations, generator)
+        cgc_neg, nc_neg = _relabeled(cgc_bottom, nc_bottom, fptn, iterations, generator)
+        diffs[r] = rank_auc(cgc_pos, cgc_neg, tpfn, fptn) - _median_auc(nc_pos, nc_neg)
+    return diffs
+
+
+def _replicate_batch(b, replicates, streams, scores, tpfn, fptn, iterations):
+    '''bootstrap AUROCs of both pair classes and permuted differences of batch b'''
+    generator = streams.generator('batch', b)
+    return (bootstrap_aucs(scores['cgc_top'], scores['cgc_bottom'], replicates, generator, tpfn, fptn),
+            bootstrap_median_aucs(scores['nc_top'], scores['nc_bottom'], tpfn, fptn, iterations, replicates, generator),
+            permutation_diffs(scores['cgc_top'], scores['cgc_bottom'], scores['nc_top'], scores['nc_bottom'], tpfn, fptn,
+                              iterations, replicates, generator))
+
+
+def _interval(values, alpha):
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return np.nan, np.nan
+    return tuple(np.percentile(values, [100*alpha/2, 100*(1-alpha/2)]))
+
+
+def auroc_intervals(m, roc, replicates=1000, workers=1, streams=None, alpha=0.05, batch=BATCH):
+    '''
+    Percentile bootstrap intervals (1 - alpha) of the AUROCs of a method and the two-sided
+    permutation p-value of their difference.
+    roc: return value of roc.tsn_roc. The CGC-CGC pairs are resampled per class, the nonCGC pairs
+    per class before the samples of the median are drawn from them, and the difference is that
+    of the table, cgc_auc - nc_auc, all over the counts and the iterations of tsn_roc,
+    workers: number of processes for the batches of replicates,
+    streams: RandomStreams, each (method, batch) draws from its own stream.
+    Returns a row of COLS_CI as a dictionary.
+    '''
+    if streams is None:
+        streams = RandomStreams()
+    sizes = [min(batch, replicates - i) for i in range(0, replicates, batch)]
+    tasks = [((b, n), {}) for b, n in enumerate(sizes)]
+    shared = dict(streams=streams.child(m, 'auroc_stats'), scores=roc['scores'], tpfn=roc['tpfn'], fptn=roc['fptn'],
+                  iterations=len(roc['nc_aucs']))
+    boot_cgc, boot_nc, diffs = [np.concatenate(values) for values in zip(*run_tasks(_replicate_batch, tasks, workers=workers, shared=shared))]
+
+    observed = roc['cgc_auc'] - roc['nc_auc']
+    valid = diffs[~np.isnan(diffs)]
+    p_value = (1 + np.sum(np.abs(valid) >= abs(observed)))/float(len(valid) + 1) if len(valid) and not np.isnan(observed) else np.nan
+
+    return dict(zip(COLS_CI, [METHOD_NAMES[m], roc['cgc_auc'], *_interval(boot_cgc, alpha),
+                              roc['nc_auc'], *_interval(boot_nc, alpha), observed, p_value, replicates]))
+
+
+def interval_table(rows):
+    '''table of auroc_intervals rows, led by their 'Cancer Type' when they have one'''
+    rows = list(rows)
+    columns = (['Cancer Type'] if any('Cancer Type' in row for row in rows) else []) + COLS_CI
+    return pd.DataFrame(rows, columns=columns)
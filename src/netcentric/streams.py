@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""
+Reproducible random streams.
+
+Every stream is derived from one master seed and a key of names, e.g.
+(method, reference gene). The key is used as the spawn key of a numpy
+SeedSequence, as SeedSequence.spawn does for its children, so the numbers drawn
+for a key do not depend on the order of the computations or on the process that
+runs them.
+"""
+
+import hashlib
+
+import numpy as np
+
+MASTER_SEED = 1234
+
+
+def name_key(name):
+    '''spawn key entry of a name: integers are kept, strings are hashed'''
+    if isinstance(name, (int, np.integer)):
+        return int(name)
+    return int.from_bytes(hashlib.sha1(str(name).encode('utf-8')).digest()[:8], 'little')
+
+
+class RandomStreams(object):
+    '''
+    Random streams keyed by names, derived from a master seed.
+    seed: master seed,
+    key: spawn key of this node, extended by child.
+    '''
+
+    def __init__(self, seed=MASTER_SEED, key=()):
+        self.seed = seed
+        self.key = tuple(key)
+
+    def child(self, *names):
+        '''streams of the sub key names, e.g. streams.child(method, gene)'''
+        return RandomStreams(self.seed, self.key + tuple(name_key(n) for n in names))
+
+    def seed_sequence(self):
+        return np.random.SeedSequence(self.seed, spawn_key=self.key)
+
+    def generator(self, *names):
+        '''numpy Generator of the stream of the sub key names'''
+        return np.random.Generator(np.random.PCG64(self.child(*names).seed_sequence()))
+
+    def sample(self, population, k, *names):
+        '''random.sample of population from the stream of the sub key names'''
+        population = list(population)
+        return [population[i] for i in self.generator(*names).choice(len(population), size=k, replace=False)]
@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+"""
+Synthetic inputs at configurable scale, in the layout of the data directory:
+    binary_matrices_all_genes_ep_mutation_filtered/{c}_TML_binary_sm.txt
+    {m}_mutation_filtered_ep_data/...        all-pairs and PPI filtered ME results per method
+    intact_nodupl_{index,edge}_file.txt      PPI network (ID format)
+    gtex_tsn_fractions_intact_filtered_applied_threshold/edges_gtex_intact_filtered_{tissue}_{th}.txt
+    known_cancer_genes/Census_allFri_Apr_26_12_49_57_2019.tsv
+    MLA_ep_mutation_filtered_all_genes/{c}_MLA_standardized.txt
+
+All draws come from RandomStreams, so a dataset is defined by its seed and sizes.
+"""
+
+import os
+
+import numpy as np
+
+from netcentric.me_results import result_file_paths
+from netcentric.streams import RandomStreams
+
+# column layout of the result files of each method, after the index column
+METHOD_COLUMNS = {'discover': ['gene1', 'gene2', 'pvalue', 'qvalue'],
+                  'discover_strat': ['gene1', 'gene2', 'pvalue', 'qvalue'],
+                  'fishers': ['gene1', 'gene2', 'pvalue', 'oddsratio'],
+                  'megsa': ['gene1', 'gene2', 'pvalue', 'loglikelyhood'],
+                  'memo': ['gene1', 'gene2', 'pvalue'],
+                  'wext': ['gene1', 'gene2', 'pvalue']}
+
+REF_FILE = 'known_cancer_genes/Census_allFri_Apr_26_12_49_57_2019.tsv'
+TSN_DIR = 'gtex_tsn_fractions_intact_filtered_applied_threshold/'
+
+
+def gene_names(n_genes):
+    return ['SG{:05d}'.format(i) for i in range(n_genes)]
+
+
+def mutation_matrix(n_genes, n_samples, streams, density=0.05):
+    '''binary samples x genes matrix with per gene mutation rates around density'''
+    gen = streams.generator('mutation_matrix')
+    rates = np.minimum(gen.gamma(1.0, density, size=n_genes), 0.9)
+    return (gen.random((n_samples, n_genes)) < rates).astype(np.int8)
+
+
+def write_mutation_matrix(outfile, genes, matrix, streams):
+    '''tab separated matrix with a sample index column and a label column y'''
+    y = streams.generator('labels').integers(0, 2, size=matrix.shape[0])
+    with open(outfile, 'w') as f:
+        f.write('\t'.join(['sample'] + genes + ['y']) + '\n')
+        for i, row in enumerate(matrix):
+            f.write('S{:05d}\t'.format(i) + '\t'.join(map(str, row.tolist())) + '\t{}\n'.format(y[i]))
+
+
+def row_pvalues(streams, m, i, n_genes, zero_fraction=0.0):
+    '''p-values of the pairs (i, j), j > i, of method m'''
+    gen = streams.generator('pvalue', m, i)
+    # mostly uniform, with an excess of small p-values
+    p = np.where(gen.random(n_genes - i - 1) < 0.1, gen.beta(0.2, 4.0, size=n_genes - i - 1), gen.random(n_genes - i - 1))
+    if zero_fraction:
+        p[gen.random(len(p)) < zero_fraction] = 0.0
+    return p
+
+
+def _extra_columns(m, p, gen):
+    if m in ('discover', 'discover_strat'):
+        return [np.minimum(p*len(p), 1.0)]
+    if m == 'fishers':
+        return [gen.gamma(2.0, 0.5, size=len(p))]
+    if m == 'megsa':
+        return [gen.chisquare(1, size=len(p))]
+    return []
+
+
+def _write_rows(f, start, g1, g2, cols):
+    lines = []
+    for k in range(len(g2)):
+        values = '\t'.join(repr(float(c[k])) for c in cols)
+        lines.append('{}\t{}\t{}\t{}\n'.format(start + k, g1, g2[k], values))
+    f.writelines(lines)
+
+
+def write_me_result(outfile, genes, m, streams, zero_fraction=0.0):
+    '''all-pairs result file of method m, returns the number of pairs'''
+    n = len(genes)
+    count = 0
+    with open(outfile, 'w') as f:
+        f.write('\t' + '\t'.join(METHOD_COLUMNS[m]) + '\n')
+        for i in range(n - 1):
+            p = row_pvalues(streams, m, i, n, zero_fraction=zero_fraction)
+            extra = _extra_columns(m, p, streams.generator('extra', m, i))
+            _write_rows(f, count, genes[i], genes[i+1:], [p] + extra)
+            count += len(p)
+    return count
+
+
+def write_me_result_subset(outfile, genes, m, edges, streams, zero_fraction=0.0):
+    '''result file of method m restricted to the network edges (i, j) with i < j'''
+    n = len(genes)
+    rows = {}
+    for i, j in sorted(edges):
+        rows.setdefault(i, []).append(j)
+    count = 0
+    with open(outfile, 'w') as f:
+        f.write('\t' + '\t'.join(METHOD_COLUMNS[m]) + '\n')
+        for i, partners in rows.items():
+            p = row_pvalues(streams, m, i, n, zero_fraction=zero_fraction)[np.array(partners) - i - 1]
+            _write_rows(f, count, genes[i], [genes[j] for j in partners], [p])
+            count += len(partners)
+    return count
+
+
+def network_edges(n_genes, mean_degree, streams):
+    '''
+    Undirected edges (i, j), i < j, with heavy tailed degrees: endpoints are drawn
+    with power law weights.
+    '''
+    gen = streams.generator('network')
+    weights = 1.0/np.arange(1, n_genes + 1)**0.8
+    weights = weights[gen.permutation(n_genes)]
+    weights /= weights.sum()
+    n_edges = int(n_genes*mean_degree/2)
+    edges = set()
+    while len(edges) < n_edges:
+        a = gen.choice(n_genes, size=n_edges, p=weights)
+        b = gen.choice(n_genes, size=n_edges, p=weights)
+        for i, j in zip(a.tolist(), b.tolist()):
+            if i != j:
+                edges.add((min(i, j), max(i, j)))
+            if len(edges) >= n_edges:
+                break
+    return sorted(edges)
+
+
+def write_network(index_file, edge_file, genes, edges, streams):
+    '''index and edge files in the ID format of intact_nodupl_*'''
+    conf = streams.generator('confidence').uniform(0.35, 1.0, size=len(edges))
+    with open(index_file, 'w') as f:
+        f.writelines('{}\t{}\n'.format(i, g) for i, g in enumerate(genes))
+    with open(edge_file, 'w') as f:
+        f.writelines('{}\t{}\t{:.3f}\n'.format(i, j, c) for (i, j), c in zip(edges, conf))
+
+
+def write_tsn(outfile, genes, edges, streams):
+    '''tissue specific network fractions of the network edges'''
+    fractions = streams.generator('tsn').random(len(edges))
+    with open(outfile, 'w') as f:
+        f.writelines('{}\t{}\t{:.4f}\n'.format(genes[i], genes[j], v) for (i, j), v in zip(edges, fractions))
+
+
+def write_reference_genes(outfile, genes, fraction, streams):
+    '''reference gene list with a header line, gene symbols in the first column'''
+    ref = streams.sample(genes, max(1, int(len(genes)*fraction)), 'reference')
+    with open(outfile, 'w') as f:
+        f.write('Gene Symbol\tName\n')
+        f.writelines('{}\tsynthetic\n'.format(g) for g in sorted(ref))
+    return ref
+
+
+def write_mla(outfile, genes, streams):
+    values = streams.generator('mla').standard_normal(len(genes))
+    with open(outfile, 'w') as f:
+        f.writelines('{}\t{:.6f}\n'.format(g, v) for g, v in zip(genes, values))
+
+
+def make_dataset(data_dir, n_genes, n_samples=500, methods=('discover', 'fishers', 'wext'), c='COADREAD', t=20,
+                 tissue='Colon', tsn_threshold=0.0, mean_degree=10, ref_fraction=0.05, seed=0):
+    '''
+    Write a synthetic dataset under data_dir. Returns a dictionary of the written
+    paths and sizes.
+    '''
+    data_dir = os.path.join(data_dir, '')
+    streams = RandomStreams(seed).child('synthetic', n_genes)
+    genes = gene_names(n_genes)
+    info = {'data_dir': data_dir, 'c': c, 't': t, 'tissue': tissue, 'n_genes': n_genes, 'n_samples': n_samples}
+
+    def path(rel):
+        outfile = data_dir + rel
+        if not os.path.exists(os.path.dirname(outfile)):
+            os.makedirs(os.path.dirname(outfile))
+        return outfile
+
+    info['matrix_file'] = path('binary_matrices_all_genes_ep_mutation_filtered/{}_TML_binary_sm.txt'.format(c))
+    # every gene mutated in more than t samples, so no gene is filtered out by the scripts
+    matrix = mutation_matrix(n_genes, n_samples, streams)
+    forced = np.argsort(streams.generator('forced_mutations').random((n_samples, n_genes)), axis=0)[:t+1]
+    matrix[forced, np.arange(n_genes)] = 1
+    write_mutation_matrix(info['matrix_file'], genes, matrix, streams)
+
+    edges = network_edges(n_genes, mean_degree, streams)
+    info['index_file'] = path('intact_nodupl_index_file.txt')
+    info['edge_file'] = path('intact_nodupl_edge_file.txt')
+    write_network(info['index_file'], info['edge_file'], genes, edges, streams)
+    info['n_edges'] = len(edges)
+
+    info['tsn_file'] = path(TSN_DIR + 'edges_gtex_intact_filtered_{}_{}.txt'.format(tissue, tsn_threshold))
+    write_tsn(info['tsn_file'], genes, edges, streams)
+
+    info['ref_file'] = path(REF_FILE)
+    info['n_ref'] = len(write_reference_genes(info['ref_file'], genes, ref_fraction, streams))
+
+    info['mla_file'] = path('MLA_ep_mutation_filtered_all_genes/{}_MLA_standardized.txt'.format(c))
+    write_mla(info['mla_file'], genes, streams)
+
+    dict_infile, dict_infile_intact = result_file_paths(methods, c, t, data_dir=data_dir)
+    info['result_files'] = dict_infile
+    info['result_files_intact'] = dict_infile_intact
+    for m in methods:
+        zero_fraction = 0.01 if m == 'wext' else 0.0
+        info['n_pairs'] = write_me_result(path(dict_infile[m][len(data_dir):]), genes, m, streams, zero_fraction=zero_fraction)
+        write_me_result_subset(path(dict_infile_intact[m][len(data_dir):]), genes, m, edges, streams, zero_fraction=zero_fraction)
+
+    return info
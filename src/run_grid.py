@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+Experiment grid runner.
+Expands a JSON grid configuration (netcentric.grid.DEFAULT_CONFIG for the keys) into
+script runs, checks that all their inputs exist, and runs those whose outputs are
+missing or older than their inputs. The cell timings are written as JSON and CSV.
+"""
+
+import argparse
+import sys
+import time
+from netcentric.datasets import DATA_DIR, DataLoader
+from netcentric.grid import expand_grid, load_config, preflight, run_grid
+from netcentric.report import RunReport
+
+
+def parse_args(argv=None):
+    description = "Run the grid of evaluations"
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('-f', '--config', type=str, required=False, default=None, help="JSON grid configuration, the full grid by default")
+    parser.add_argument('-w', '--workers', type=int, required=False, default=1, help="number of processes, groups of cells run in parallel")
+    parser.add_argument('-o', '--out', type=str, required=False, default='../grid_results/grid_report', help="report prefix, .json and .csv are added")
+    parser.add_argument('--force', action='store_true', help="also run the cells whose outputs are up to date")
+    parser.add_argument('--skip_missing', action='store_true', help="leave out the cells with missing inputs instead of stopping")
+    parser.add_argument('--dry_run', action='store_true', help="list the cells and their state without running them")
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    config = load_config(args.config)
+    cells = expand_grid(config, DataLoader(DATA_DIR))
+
+    missing = preflight(cells)
+    if missing:
+        for f, readers in missing.items():
+            print('missing input {} ({} cells)'.format(f, len(readers)))
+        if not args.skip_missing:
+            sys.exit('{} input files are missing, see above or use --skip_missing'.format(len(missing)))
+        cells = [cell for cell in cells if not cell.missing_inputs()]
+
+    if args.dry_run:
+        for cell in cells:
+            print('up_to_date' if cell.up_to_date() and not args.force else 'todo', cell)
+        return
+
+    report = RunReport(config=config, cells=len(cells), workers=args.workers, started=time.strftime('%Y-%m-%d %H:%M:%S'))
+    start = time.perf_counter()
+    run_grid(cells, workers=args.workers, force=args.force, report=report)
+    report.add('total', time.perf_counter() - start, items=len(cells))
+
+    report.write_json(args.out + '.json')
+    report.write_csv(args.out + '.csv')
+    failed = [record for record in report.stages if record.get('status') == 'failed']
+    print('cells: {}, failed: {}, report: {}.json'.format(len(cells), len(failed), args.out))
+
+
+if __name__ == '__main__':
+    main()